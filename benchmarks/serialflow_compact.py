@@ -0,0 +1,91 @@
+# SPDX-FileCopyrightText: 2026 RobotClass
+#
+# SPDX-License-Identifier: MIT
+
+"""
+`serialflow_compact`
+====================================================
+
+Объём кадра SerialFlow в обычном и компактном режиме на компьютере
+
+Передаются 8 медленно меняющихся каналов телеметрии (синусоида с шумом),
+для каждого формата считается средний размер кадра в байтах и предельная
+скорость в пакетах в секунду на линии 115200 бод. Принятые пакеты
+сверяются с отправленными.
+
+**Пример**
+python benchmarks/serialflow_compact.py 5000
+"""
+
+import math
+import os
+import random
+import sys
+
+sys.path.insert( 0, os.path.join( os.path.dirname( os.path.abspath( __file__ ) ), ".." ) )
+
+from robotclass_serialflow import SerialFlow  # pylint: disable=wrong-import-position
+
+BAUDRATE = 115200
+
+
+class _Pipe():
+    """Порт в памяти: что записано, то и читается"""
+
+    def __init__( self ):
+        self.buf = bytearray()
+
+    def write( self, data ):
+        self.buf += data
+        return len(data)
+
+    @property
+    def in_waiting( self ):
+        return len(self.buf)
+
+    def readinto( self, mv ):
+        n = min( len(mv), len(self.buf) )
+        mv[:n] = self.buf[:n]
+        del self.buf[:n]
+        return n
+
+
+def telemetry( count, channels=8, seed=1 ):
+    rnd = random.Random( seed )
+    return [[int( 2000 + 300*math.sin( i/50 + j ) + rnd.randint( -3, 3 ) ) for j in range( channels )]
+            for i in range( count )]
+
+
+# результат: средний размер кадра в байтах
+def measure( data, v_length, separate, compact ):
+    port = _Pipe()
+    tx = SerialFlow( port )
+    rx = SerialFlow( port )
+    for flow in (tx, rx):
+        flow.setPacketFormat( v_length, len(data[0]), separate )
+        if compact:
+            flow.setCompactMode()
+    for values in data:
+        for v in values:
+            tx.setPacketValue( v )
+        tx.sendPacket()
+    size = len(port.buf) / len(data)
+    if list( rx.packets() ) != data:
+        raise RuntimeError( "decoded packets differ from sent ones" )
+    return size
+
+
+def main():
+    count = int( sys.argv[1] ) if len(sys.argv) > 1 else 5000
+    data = telemetry( count )
+    for v_length in (2, 4):
+        compact = measure( data, v_length, False, True )
+        for separate in (False, True):
+            legacy = measure( data, v_length, separate, False )
+            print( "v_length=%d separate=%s: %.1f -> %.1f B/pkt, %d -> %d pkt/s @%d (x%.1f)" % (
+                v_length, separate, legacy, compact,
+                BAUDRATE / 10 / legacy, BAUDRATE / 10 / compact, BAUDRATE, legacy / compact) )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+# SPDX-FileCopyrightText: 2026 RobotClass
+#
+# SPDX-License-Identifier: MIT
+
+"""
+`serialflow_reliable_link`
+====================================================
+
+Доставка пакетов SerialFlow и ReliableSerialFlow по зашумлённой линии на компьютере
+
+LossyLink - имитация линии с ограниченной скоростью, задержкой, потерей
+кадров и искажением байт. measureLink() передаёт по ней пакеты и считает
+скорость доставки, байты в линии, повторы и ошибки.
+
+**Пример**
+python benchmarks/serialflow_reliable_link.py 1000
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert( 0, os.path.join( os.path.dirname( os.path.abspath( __file__ ) ), ".." ) )
+
+# pylint: disable=wrong-import-position
+from robotclass_serialflow import SerialFlow
+from robotclass_serialflow_reliable import ReliableSerialFlow
+
+
+class LossyLink():
+    """Имитация последовательной линии между двумя концами a и b.
+
+    Концы поддерживают write(), in_waiting и readinto(), как serial.Serial.
+    baud - скорость линии, бод (10 бит на байт)
+    delay - задержка распространения, мс
+    loss - вероятность потери записанного кадра целиком
+    ber - вероятность искажения каждого байта
+    """
+
+    def __init__( self, baud=115200, delay=2, loss=0.0, ber=0.0, seed=None ):
+        self._rnd = random.Random( seed ) if seed is not None else random
+        self.byteTime = 10000000000 // baud
+        self.delay = delay * 1000000
+        self.loss = loss
+        self.ber = ber
+        self.a = _LinkEnd( self )
+        self.b = _LinkEnd( self )
+        self.a._peer = self.b
+        self.b._peer = self.a
+        self.lost = 0               # кадров потеряно
+        self.corrupted = 0          # байт искажено
+
+    def _transmit( self, end, data ):
+        data = bytearray( data )
+        now = time.monotonic_ns()
+        # линия занята, пока не передан предыдущий кадр этого направления
+        start = max( now, end._busy_until )
+        end._busy_until = start + len(data) * self.byteTime
+        end.bytes += len(data)
+        if self.loss and self._rnd.random() < self.loss:
+            self.lost += 1
+            return
+        if self.ber:
+            for i in range( len(data) ):
+                if self._rnd.random() < self.ber:
+                    data[i] ^= 1 << self._rnd.randrange( 8 )
+                    self.corrupted += 1
+        end._peer._inbox.append( (end._busy_until + self.delay, data) )
+
+
+class _LinkEnd():
+    def __init__( self, link ):
+        self._link = link
+        self._peer = None
+        self._inbox = []            # (время доставки, байты)
+        self._ready = bytearray()
+        self._busy_until = 0
+        self.bytes = 0              # байт передано с этого конца
+
+    def write( self, data ):
+        self._link._transmit( self, data )
+        return len(data)
+
+    @property
+    def in_waiting( self ):
+        now = time.monotonic_ns()
+        while self._inbox and self._inbox[0][0] <= now:
+            self._ready += self._inbox.pop( 0 )[1]
+        return len(self._ready)
+
+    def readinto( self, buf ):
+        n = min( len(buf), len(self._ready) )
+        buf[:n] = self._ready[:n]
+        del self._ready[:n]
+        return n
+
+    def close( self ):
+        pass
+
+
+# замер доставки count пакетов формата schema от a к b через LossyLink
+# reliable=False - для сравнения, обычный SerialFlow на той же линии
+# первое поле пакета - его номер, остальные вычисляются из номера,
+# поэтому неверно разобранный пакет обнаруживается на приёме
+# результат: словарь со скоростью, числом байт в линии и ошибками
+def measureLink( count=1000, schema="HhhI", reliable=True, window=16, timeout=30.0, **link_args ):
+    link = LossyLink( **link_args )
+    if reliable:
+        tx = ReliableSerialFlow( link.a, window )
+        rx = ReliableSerialFlow( link.b, window )
+    else:
+        tx = SerialFlow( link.a )
+        rx = SerialFlow( link.b )
+    tx.setPacketSchema( schema )
+    rx.setPacketSchema( schema )
+    fields = len(schema)
+
+    def expected( n ):
+        return [n & 0x7FFF] + [(n * 7 + k) & 0x7FFF for k in range( 1, fields )]
+
+    sent = 0
+    got = 0
+    wrong = 0
+    start = time.monotonic_ns()
+    end = start + int( timeout * 1000000000 )
+    while time.monotonic_ns() < end:
+        if sent < count and (not reliable or tx.pending < window):
+            for v in expected( sent ):
+                tx.setPacketValue( v )
+            tx.sendPacket()
+            sent += 1
+        elif reliable:
+            tx.poll()
+        for values in rx.packets():
+            if list( values ) != expected( values[0] ) or (reliable and values[0] != got & 0x7FFF):
+                wrong += 1
+            else:
+                got += 1
+        if got >= count:
+            break
+        if not reliable and sent >= count and not link.b._inbox and not link.b._ready:
+            break
+    elapsed = (time.monotonic_ns() - start) / 1000000000
+    return {
+        "sent": sent,
+        "delivered": got,
+        "wrong": wrong,
+        "seconds": elapsed,
+        "packets_per_s": got / elapsed if elapsed > 0 else 0.0,
+        "forward_bytes": link.a.bytes,
+        "reverse_bytes": link.b.bytes,
+        "retransmits": tx.txRetransmits if reliable else 0,
+        "lost": link.lost,
+        "corrupted": link.corrupted,
+    }
+
+
+def main():
+    count = int( sys.argv[1] ) if len(sys.argv) > 1 else 1000
+    for loss, ber in ((0.0, 0.0), (0.01, 0.0), (0.05, 0.0), (0.0, 0.001), (0.05, 0.001)):
+        for reliable in (False, True):
+            r = measureLink( count, reliable=reliable, loss=loss, ber=ber, seed=1 )
+            print( "%s loss=%.2f ber=%.3f: delivered %d wrong %d, %.0f pkt/s, bytes %d/%d, retransmits %d" % (
+                "reliable" if reliable else "plain   ", loss, ber, r["delivered"], r["wrong"],
+                r["packets_per_s"], r["forward_bytes"], r["reverse_bytes"], r["retransmits"]) )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# SPDX-FileCopyrightText: 2026 RobotClass
+#
+# SPDX-License-Identifier: MIT
+
+"""
+`serialflow_send`
+====================================================
+
+Скорость SerialFlow.sendPacket() на компьютере, пакетов в секунду
+
+Сравниваются прежняя отправка (по вызову write на каждый байт) и текущая
+(кадр собирается в буфере и уходит одним write). Пакеты пишутся в
+псевдотерминал через pySerial, обратная сторона вычитывается отдельным потоком.
+Без pySerial или pty пакеты пишутся в буфер в памяти.
+
+**Пример**
+python benchmarks/serialflow_send.py 5000
+
+**Зависимости:**
+
+* pySerial: https://github.com/pyserial/pyserial (необязательно)
+"""
+
+import os
+import sys
+import threading
+import time
+
+sys.path.insert( 0, os.path.join( os.path.dirname( os.path.abspath( __file__ ) ), ".." ) )
+
+from robotclass_serialflow import SerialFlow  # pylint: disable=wrong-import-position
+
+
+class PerByteSerialFlow( SerialFlow ):
+    """Прежняя отправка: каждый байт кадра - отдельный вызов write"""
+
+    def sendPacket( self ):
+        self._serial.write( bytes([0x12]) )
+        for i in range( self._vs_idx ):
+            for b in range( self._v_length ):
+                v = (self._vs[i]>>(b<<3)) & 0xFF
+                if v==0x12 or v==0x13 or v==0x7D or (v==0x10 and self._separate):
+                    self._serial.write( bytes([0x7D]) )
+                self._serial.write( bytes([v]) )
+
+            if self._separate and i < self._vs_idx-1:
+                self._serial.write( bytes([0x10]) )
+
+        self._serial.write( bytes([0x13]) )
+        self._vs_idx = 0
+
+
+class _Sink():
+    def __init__( self ):
+        self.data = bytearray()
+
+    def write( self, data ):
+        self.data += data
+        return len(data)
+
+    def close( self ):
+        pass
+
+
+# порт pySerial на псевдотерминале; None, если pty или pySerial недоступны
+def _openPty():
+    try:
+        import pty  # pylint: disable=import-outside-toplevel
+        import serial  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+    master, slave = pty.openpty()
+    port = serial.Serial( os.ttyname( slave ), 115200 )
+
+    def drain():
+        while True:
+            try:
+                if not os.read( master, 65536 ):
+                    break
+            except OSError:
+                break
+
+    threading.Thread( target=drain, daemon=True ).start()
+    return port
+
+
+def measure( cls, count, separate ):
+    port = _openPty() or _Sink()
+    flow = cls( port )
+    flow.setPacketFormat( 2, 8, separate )
+    start = time.perf_counter()
+    for i in range( count ):
+        for j in range( 8 ):
+            flow.setPacketValue( (i*31 + j*977) & 0xFFFF )
+        flow.sendPacket()
+    rate = count / (time.perf_counter() - start)
+    port.close()
+    return rate
+
+
+def main():
+    count = int( sys.argv[1] ) if len(sys.argv) > 1 else 5000
+    for separate in (False, True):
+        before = measure( PerByteSerialFlow, count, separate )
+        after = measure( SerialFlow, count, separate )
+        print( "separate=%s: %d -> %d pkt/s (x%.1f)" % (separate, before, after, after / before) )
+
+
+if __name__ == "__main__":
+    main()
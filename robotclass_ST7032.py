@@ -27,6 +27,11 @@ device.write("Hello World!")
 device.setCursor(0,1)
 device.write("Goodbye")
 
+**Асинхронная инициализация**
+device = RobotClass_ST7032(i2c)    # не ждёт стабилизации питания
+...                                # другая работа
+await device.ready()               # или первая же команда дождётся сама
+
 Реализация
 --------------------
 
@@ -38,11 +43,13 @@ device.write("Goodbye")
 **Зависимости:**
 
 * Библиотека Adafruit's Bus Device: https://github.com/adafruit/Adafruit_CircuitPython_BusDevice
+* Библиотека Adafruit's Ticks: https://github.com/adafruit/Adafruit_CircuitPython_Ticks
 """
 
 __version__ = "1.0"
 
 import time
+from adafruit_ticks import ticks_ms, ticks_add, ticks_diff
 
 ST7032_I2C_DEFAULT_ADDR     = const(0x3E)
 
@@ -121,6 +128,47 @@ LCD_RAB_2_50            = const(0x05)        # 1+(Rb/Ra)=2.50
 LCD_RAB_3_00            = const(0x06)        # 1+(Rb/Ra)=3.00
 LCD_RAB_3_75            = const(0x07)        # 1+(Rb/Ra)=3.75
 
+_DDRAM_ROW_LENGTH       = const(40)          # длина строки DDRAM
+
+# управляющий байт I2C: Co - за данными следует ещё управляющий байт, RS - данные
+_CONTROL_COMMAND        = const(0x00)        # Co=0, RS=0: последняя команда
+_CONTROL_COMMAND_CONT   = const(0x80)        # Co=1, RS=0: команда, затем управляющий байт
+_CONTROL_DATA           = const(0x40)        # Co=0, RS=1: все следующие байты - данные
+
+_ROW_OFFSETS            = (0x00, 0x40, 0x14, 0x54)
+
+_FLUSH_MERGE_GAP        = const(3)           # объединять участки, если между ними до 3 символов
+
+# символы CGRAM для шкал и крупных цифр
+_GLYPH_FULL             = b"\x1f\x1f\x1f\x1f\x1f\x1f\x1f\x1f"
+_GLYPH_TOP              = b"\x1f\x1f\x1f\x00\x00\x00\x00\x00"
+_GLYPH_BOTTOM           = b"\x00\x00\x00\x00\x00\x1f\x1f\x1f"
+_GLYPH_TOP_BOTTOM       = b"\x1f\x1f\x1f\x00\x00\x1f\x1f\x1f"
+_BAR_COLUMN_MASKS       = (0x00, 0x10, 0x18, 0x1C, 0x1E)   # заполнено 0..4 столбца из 5
+
+# крупные цифры 3x2: верхняя строка, нижняя строка
+# F - полный блок, T - верхняя полоса, B - нижняя, X - обе полосы
+_BIG_DIGITS = {
+    "0": ("FTF", "FBF"),
+    "1": ("TF ", "BFB"),
+    "2": ("XXF", "FBB"),
+    "3": ("XXF", "BBF"),
+    "4": ("FBF", "  F"),
+    "5": ("FXX", "BBF"),
+    "6": ("FXX", "FBF"),
+    "7": ("TTF", "  F"),
+    "8": ("FXF", "FBF"),
+    "9": ("FXF", "BBF"),
+    "-": ("BBB", "   "),
+    " ": ("   ", "   "),
+}
+_BIG_GLYPHS = {
+    "F": _GLYPH_FULL,
+    "T": _GLYPH_TOP,
+    "B": _GLYPH_BOTTOM,
+    "X": _GLYPH_TOP_BOTTOM,
+}
+
 class RobotClass_ST7032:
 
     busnum = 0
@@ -128,6 +176,7 @@ class RobotClass_ST7032:
     _displaymode = 0
     _displayfunction = 0
     lines = 2
+    cols = 16
     dotsize=0
     _numlines = 1
     _currline = 0
@@ -136,9 +185,31 @@ class RobotClass_ST7032:
     def __init__(self, i2c):
         import adafruit_bus_device.i2c_device as i2c_device
         self._i2c = i2c_device.I2CDevice(i2c, ST7032_I2C_DEFAULT_ADDR)
-        self.init_hw()
-
+        self._fb = None                         # кадровый буфер, создаётся в drawText
+        self._ddram = bytearray(b" " * (2 * _DDRAM_ROW_LENGTH))   # что сейчас в DDRAM
+        self._nbytes = 0                        # счётчик байт, отправленных в шину
+        self._ncmds = 0                         # счётчик отправленных команд
+        self._busy = False                      # дисплей выполняет медленную команду
+        self._busy_until = 0                    # до этого момента (ticks_ms)
+        self._init_pending = False              # begin() вызван, инициализация не завершена
+        self._cgram = [None] * 8                # содержимое CGRAM по номерам символов
+        self._cgram_used = [0] * 8              # момент последнего использования символа
+        self._cgram_clock = 0
+        self._ext_regs = {}                     # теневые копии расширенных регистров
+        self._ext = False                       # выбрана расширенная таблица команд (IS=1)
+        self._addr = None                       # адрес DDRAM, None - неизвестен или CGRAM
+        self._marquee = None                    # текст бегущей строки
+        self.begin()
+
+    # полная инициализация с ожиданием стабилизации питания
     def init_hw(self):
+        self.begin()
+        self._completeInit()
+
+    # первая фаза инициализации, не блокирует
+    # оставшиеся команды будут отправлены в ready() или перед первой командой
+    def begin(self):
+        self._init_pending = False
         self._displayfunction  = LCD_8BITMODE | LCD_1LINE | LCD_5x8DOTS
 
         if (self.lines > 1) :
@@ -152,43 +223,73 @@ class RobotClass_ST7032:
             self._displayfunction |= LCD_5x10DOTS
 
         # настройка отображения
+        self._ext_regs = {}
+        self._addr = None
         self.normalFunctionSet()
 
-        self.extendFunctionSet()
-        self.command(LCD_EX_SETBIASOSC | LCD_BIAS_1_4 | LCD_OSC_347HZ)          # 1/5bias, OSC=183Hz@3.0V
-        self.command(LCD_EX_FOLLOWERCONTROL | LCD_FOLLOWER_ON | LCD_RAB_2_00)     # internal follower circuit is turn on
-        time.sleep(0.2)                                 # Wait time >200ms (for power stable)
-        self.normalFunctionSet()
+        self._extendedCommands((
+            LCD_EX_SETBIASOSC | LCD_BIAS_1_4 | LCD_OSC_347HZ,           # 1/5bias, OSC=183Hz@3.0V
+            LCD_EX_FOLLOWERCONTROL | LCD_FOLLOWER_ON | LCD_RAB_2_00,    # internal follower circuit is turn on
+        ))
+        self._setBusy(200)                              # Wait time >200ms (for power stable)
+        self._init_pending = True
+
+    # ожидание готовности дисплея без блокировки цикла asyncio
+    async def ready(self):
+        import asyncio  # pylint: disable=import-outside-toplevel
+
+        while True:
+            if self._busy:
+                delay = ticks_diff(self._busy_until, ticks_ms())
+                if delay > 0:
+                    await asyncio.sleep(delay / 1000)
+            if not self._init_pending:
+                break
+            self._completeInit()
+
+    # True, если дисплей готов принять команду без ожидания
+    def isReady(self):
+        if self._busy and ticks_diff(self._busy_until, ticks_ms()) > 0:
+            return False
+        return not self._init_pending
+
+    def _completeInit(self):
+        self._init_pending = False
 
         # включение дисплея без курсора
-        self._displaycontrol  = 0x00 #LCD_DISPLAYON | LCD_CURSOROFF | LCD_BLINKOFF
-        self.setDisplayControl(LCD_DISPLAYON | LCD_CURSOROFF | LCD_BLINKOFF)
-
-        # очистка дисплея
-        self.clear()
+        self._displaycontrol  = LCD_DISPLAYON | LCD_CURSOROFF | LCD_BLINKOFF
+        self.command(LCD_DISPLAYCONTROL | self._displaycontrol)
 
         # настройка направления текста
-        self._displaymode      = 0x00 #LCD_ENTRYLEFT | LCD_ENTRYSHIFTDECREMENT
-        self.setEntryMode(LCD_ENTRYLEFT | LCD_ENTRYSHIFTDECREMENT)
+        self._displaymode      = LCD_ENTRYLEFT | LCD_ENTRYSHIFTDECREMENT
+        self.command(LCD_ENTRYMODESET | self._displaymode)
+
+        # очистка дисплея последней: её время ожидания не блокирует инициализацию
+        self.clear()
 
+    # команды отправляются, только если состояние регистра меняется
     def setDisplayControl(self,setBit) :
-        self._displaycontrol |= setBit
-        self.command(LCD_DISPLAYCONTROL | self._displaycontrol)
+        if self._displaycontrol | setBit != self._displaycontrol:
+            self._displaycontrol |= setBit
+            self.command(LCD_DISPLAYCONTROL | self._displaycontrol)
 
 
     def resetDisplayControl(self,resetBit) :
-        self._displaycontrol &= ~resetBit
-        self.command(LCD_DISPLAYCONTROL | self._displaycontrol)
+        if self._displaycontrol & resetBit:
+            self._displaycontrol &= ~resetBit
+            self.command(LCD_DISPLAYCONTROL | self._displaycontrol)
 
 
     def setEntryMode(self,setBit) :
-        self._displaymode |= setBit
-        self.command(LCD_ENTRYMODESET | self._displaymode)
+        if self._displaymode | setBit != self._displaymode:
+            self._displaymode |= setBit
+            self.command(LCD_ENTRYMODESET | self._displaymode)
 
 
     def resetEntryMode(self,resetBit) :
-        self._displaymode &= ~resetBit
-        self.command(LCD_ENTRYMODESET | self._displaymode)
+        if self._displaymode & resetBit:
+            self._displaymode &= ~resetBit
+            self.command(LCD_ENTRYMODESET | self._displaymode)
 
 
     def normalFunctionSet(self) :
@@ -199,10 +300,30 @@ class RobotClass_ST7032:
         self.command(LCD_FUNCTIONSET | self._displayfunction | LCD_EX_INSTRUCTION)
 
     def setContrast(self,cont):
-        self.extendFunctionSet()
-        self.command(LCD_EX_CONTRASTSETL | (cont & 0x0f))                 # Contrast set
-        self.command(LCD_EX_POWICONCONTRASTH | LCD_ICON_ON | LCD_BOOST_ON | ((cont >> 4) & 0x03)) # Power, ICON, Contrast control
-        self.normalFunctionSet()
+        self._extendedCommands((
+            LCD_EX_CONTRASTSETL | (cont & 0x0f),                                            # Contrast set
+            LCD_EX_POWICONCONTRASTH | LCD_ICON_ON | LCD_BOOST_ON | ((cont >> 4) & 0x03),    # Power, ICON, Contrast control
+        ))
+
+    # делитель (LCD_BIAS_*) и частота генератора (LCD_OSC_*)
+    def setBias(self, bias, osc):
+        self._extendedCommands((LCD_EX_SETBIASOSC | bias | osc,))
+
+    # повторитель (LCD_FOLLOWER_*) и коэффициент усиления (LCD_RAB_*)
+    def setFollower(self, follower, rab):
+        self._extendedCommands((LCD_EX_FOLLOWERCONTROL | follower | rab,))
+
+    # отправка изменившихся команд расширенной таблицы одной транзакцией
+    # с переключением IS туда и обратно
+    def _extendedCommands(self, values):
+        changed = [LCD_FUNCTIONSET | self._displayfunction | LCD_EX_INSTRUCTION]
+        for value in values:
+            if self._ext_regs.get(value & 0xF0) != value:
+                self._ext_regs[value & 0xF0] = value
+                changed.append(value)
+        if len(changed) > 1:
+            changed.append(LCD_FUNCTIONSET | self._displayfunction)
+            self._commands(changed)
 
     """
     def setIcon(self,addr, bit) :
@@ -216,22 +337,36 @@ class RobotClass_ST7032:
     # очистка дисплея, перевод курсора в нулевую позицию
     def clear(self):
         self.command(LCD_CLEARDISPLAY)  # self.clear display, set cursor position to zero
-        time.sleep(0.002)  # this command takes a long time!
+        self._setBusy(2)  # this command takes a long time!
+        self._ddram[:] = b" " * len(self._ddram)
 
     # перевод курсора в нулевую позицию
     def home(self):
         self.command(LCD_RETURNHOME)  # set cursor position to zero
-        time.sleep(0.002)  # this command takes a long time!
+        self._setBusy(2)  # this command takes a long time!
 
     # перевод курсора в позицию col, row
+    # адрес не отправляется, если курсор уже в этой позиции
     def setCursor(self,col,row):
-        row_offsets = [ 0x00, 0x40, 0x14, 0x54 ]
-
-        if ( row > self._numlines ) :
-            row = self._numlines-1    # we count rows starting w/0
-
-
-        self.command(LCD_SETDDRAMADDR | (col + row_offsets[row]))
+        addr = self._ddramAddr(col, row)
+        if addr != self._addr:
+            self.command(LCD_SETDDRAMADDR | addr)
+
+    # вывод строки с позиции col, row одной транзакцией I2C
+    def writeAt(self, col, row, value):
+        addr = self._ddramAddr(col, row)
+        if addr == self._addr:
+            self.writeBuf(self._encode(value))
+            return
+        data = self._encode(value)
+        buf = bytearray(3 + len(data))
+        buf[0] = _CONTROL_COMMAND_CONT
+        buf[1] = LCD_SETDDRAMADDR | addr
+        buf[2] = _CONTROL_DATA
+        buf[3:] = data
+        self._send(buf, 1)
+        self._addr = addr
+        self._advance(data)
 
 
     # включение/выключение дисплея
@@ -266,6 +401,55 @@ class RobotClass_ST7032:
         self.command(LCD_CURSORSHIFT | LCD_DISPLAYMOVE | LCD_MOVERIGHT)
 
 
+    # бегущая строка на аппаратной прокрутке
+    # текст один раз записывается в строку row DDRAM (40 символов),
+    # дальше каждый шаг - одна команда сдвига дисплея
+    # rate - число шагов в секунду
+    # сдвиг дисплея общий для обеих строк: вторая строка тоже поедет
+    def startMarquee(self, text, row=0, rate=4):
+        data = self._encode(text)
+        if len(data) < _DDRAM_ROW_LENGTH:
+            data += b" " * (_DDRAM_ROW_LENGTH - len(data))
+        self._marquee = data
+        self._marquee_row = row
+        self._marquee_step = 0
+        self._marquee_period = max(1, int(1000 / rate))
+        self.home()
+        self.writeAt(0, row, data[:_DDRAM_ROW_LENGTH])
+        self._marquee_next = ticks_add(ticks_ms(), self._marquee_period)
+
+    # вызывать в основном цикле, не блокирует
+    # результат: True, если был сделан шаг
+    def tickMarquee(self):
+        if self._marquee is None:
+            return False
+        now = ticks_ms()
+        if ticks_diff(now, self._marquee_next) < 0:
+            return False
+        self._marquee_next = ticks_add(self._marquee_next, self._marquee_period)
+        if ticks_diff(now, self._marquee_next) >= 0:
+            # пропустили больше шага - не догоняем, а продолжаем с текущего момента
+            self._marquee_next = ticks_add(now, self._marquee_period)
+
+        self.scrollDisplayLeft()
+        self._marquee_step += 1
+
+        # текст длиннее DDRAM: ушедший за левый край столбец заполняется
+        # символом, который появится в нём через 40 шагов
+        text = self._marquee
+        if len(text) > _DDRAM_ROW_LENGTH:
+            k = self._marquee_step
+            i = (k + _DDRAM_ROW_LENGTH - 1) % len(text)
+            self.writeAt((k - 1) % _DDRAM_ROW_LENGTH, self._marquee_row, text[i:i + 1])
+        return True
+
+    # остановка бегущей строки и возврат дисплея в исходное положение
+    def stopMarquee(self):
+        if self._marquee is not None:
+            self._marquee = None
+            self.home()
+
+
     # направление текста слева направо
     def leftToRight(self) :
         self.setEntryMode(LCD_ENTRYLEFT)
@@ -288,27 +472,273 @@ class RobotClass_ST7032:
     # Перезапись первых 8 CGRAM (символов)
     def createChar(self,location, charmap) :
         location &= 0x7
-        self.command(LCD_SETCGRAMADDR | (location << 3))
-        for i in range(0,7):
-            self.writeData(charmap[i])
-
+        n = min(len(charmap), 8)
+        buf = bytearray(3 + n)
+        buf[0] = _CONTROL_COMMAND_CONT
+        buf[2] = _CONTROL_DATA
+        if self._displaymode & LCD_ENTRYLEFT:
+            buf[1] = LCD_SETCGRAMADDR | (location << 3)
+            for i in range(n):
+                buf[3 + i] = charmap[i] & 0x1F
+        else:
+            # при записи справа налево адрес CGRAM тоже уменьшается:
+            # строки символа выводятся с последней
+            buf[1] = LCD_SETCGRAMADDR | ((location << 3) + n - 1)
+            for i in range(n):
+                buf[3 + i] = charmap[n - 1 - i] & 0x1F
+        self._send(buf, 1)
+        self._addr = None
+
+        self._cgram_clock += 1
+        self._cgram_used[location] = self._cgram_clock
+        self._cgram[location] = bytes(charmap[i] & 0x1F for i in range(8)) if n == 8 else None
+
+    # загрузка символа в CGRAM через кэш
+    # если такой символ уже загружен, повторной записи не будет;
+    # иначе занимается давно не использованная ячейка, которой нет на экране
+    # результат: код символа 0..7
+    def loadGlyph(self, charmap):
+        return self._loadGlyph(charmap, 0)
+
+    def _loadGlyph(self, charmap, keep):
+        key = bytes([charmap[i] & 0x1F if i < len(charmap) else 0 for i in range(8)])
+        self._cgram_clock += 1
+        for slot in range(8):
+            if self._cgram[slot] == key:
+                self._cgram_used[slot] = self._cgram_clock
+                return slot
+
+        # keep - ячейки, нужные текущей отрисовке, их тоже не трогаем
+        busy = self._visibleGlyphs() | keep
+        slot = -1
+        for i in range(8):
+            if busy & (1 << i):
+                continue
+            if slot < 0 or self._cgram_used[i] < self._cgram_used[slot]:
+                slot = i
+        if slot < 0:
+            raise RuntimeError("No free CGRAM slot")
+        self.createChar(slot, key)
+        return slot
+
+    # битовая маска символов CGRAM, которые есть в DDRAM или в кадровом буфере
+    def _visibleGlyphs(self):
+        mask = 0
+        for buf in (self._ddram, self._fb):
+            if buf is None:
+                continue
+            for c in buf:
+                if c < 16:                  # коды 8..15 повторяют 0..7
+                    mask |= 1 << (c & 0x7)
+        return mask
+
+
+
+    # -------- Кадровый буфер --------
+    # Буфер cols x lines хранится на стороне контроллера. drawText меняет
+    # только буфер, flush отправляет на дисплей лишь изменившиеся участки.
+    # Вывод через write() в обход буфера учитывается, если известна позиция курсора.
+
+    # вывод строки s в буфер с позиции col, row
+    def drawText(self, col, row, s):
+        if self._fb is None:
+            self._fb = bytearray(b" " * (self.cols * self.lines))
+        if row < 0 or row >= self.lines:
+            return
+        pos = row * self.cols
+        for c in s:
+            if col >= self.cols:
+                break
+            if col >= 0:
+                self._fb[pos + col] = (c if isinstance(c, int) else ord(c)) & 0xFF
+            col += 1
+
+    # горизонтальная шкала в буфере: width символов, 5 делений в каждом
+    # использует не больше двух ячеек CGRAM: полный блок и неполный
+    def drawBar(self, col, row, width, value, maximum=100):
+        if maximum <= 0:
+            return
+        value = min(max(value, 0), maximum)
+        n = (value * width * 5 + maximum // 2) // maximum
+        full, part = divmod(int(n), 5)
+
+        keep = 0
+        codes = bytearray(b" " * width)
+        if full:
+            code = self._loadGlyph(_GLYPH_FULL, keep)
+            keep |= 1 << code
+            for i in range(full):
+                codes[i] = code
+        if part:
+            codes[full] = self._loadGlyph(bytes([_BAR_COLUMN_MASKS[part]]) * 8, keep)
+        self.drawText(col, row, codes)
+
+    # крупные цифры высотой в две строки, 3 символа на цифру + пробел
+    # допустимы цифры, пробел и минус; использует 4 ячейки CGRAM
+    def drawBigDigits(self, col, text):
+        codes = {" ": 0x20}
+        keep = 0
+        for ch in text:
+            for line in _BIG_DIGITS.get(ch, _BIG_DIGITS[" "]):
+                for g in line:
+                    if g not in codes:
+                        code = self._loadGlyph(_BIG_GLYPHS[g], keep)
+                        keep |= 1 << code
+                        codes[g] = code
+
+        for ch in text:
+            top, bottom = _BIG_DIGITS.get(ch, _BIG_DIGITS[" "])
+            self.drawText(col, 0, bytes([codes[g] for g in top]) + b" ")
+            self.drawText(col, 1, bytes([codes[g] for g in bottom]) + b" ")
+            col += 4
+
+    # очистка буфера (дисплей очистится при следующем flush)
+    def clearBuffer(self):
+        if self._fb is not None:
+            self._fb[:] = b" " * len(self._fb)
+
+    # вывод изменений буфера на дисплей, одна установка курсора на участок
+    # результат: (число байт, число команд), отправленных в шину
+    def flush(self):
+        nbytes = self._nbytes
+        ncmds = self._ncmds
+        if self._fb is not None:
+            fb = self._fb
+            ddram = self._ddram
+            for row in range(self.lines):
+                pos = row * self.cols
+                base = row * _DDRAM_ROW_LENGTH
+                col = 0
+                while col < self.cols:
+                    if fb[pos + col] == ddram[base + col]:
+                        col += 1
+                        continue
+                    # короткие промежутки без изменений дешевле переслать,
+                    # чем открывать новую транзакцию с установкой курсора
+                    start = col
+                    end = col
+                    while col < self.cols and col - end <= _FLUSH_MERGE_GAP:
+                        if fb[pos + col] != ddram[base + col]:
+                            end = col + 1
+                        col += 1
+                    col = end
+                    if self._displaymode & LCD_ENTRYLEFT:
+                        self.writeAt(start, row, fb[pos + start:pos + end])
+                    else:
+                        # при записи справа налево участок выводится с конца
+                        self.writeAt(end - 1, row, bytes(reversed(fb[pos + start:pos + end])))
+        return (self._nbytes - nbytes, self._ncmds - ncmds)
 
 
     # -------- Методы низкого уровня --------
 
     def command(self, value) :
-        with self._i2c:
-            self._i2c.write(bytes([0x00, value & 0xFF]))
+        self._send(bytes([_CONTROL_COMMAND, value & 0xFF]), 1)
+        self._track(value & 0xFF)
             
     def writeData(self, value) :
-        with self._i2c:
-            self._i2c.write(bytes([0x40, value & 0xFF]))
+        self._send(bytes([_CONTROL_DATA, value & 0xFF]), 0)
+        self._advance((value & 0xFF,))
+
+    # запись массива байт в DDRAM/CGRAM одной транзакцией
+    def writeBuf(self, data):
+        buf = bytearray(1 + len(data))
+        buf[0] = _CONTROL_DATA
+        buf[1:] = data
+        self._send(buf, 0)
+        self._advance(data)
+
+    # несколько команд одной транзакцией
+    def _commands(self, values):
+        buf = bytearray(2 * len(values))
+        for i, value in enumerate(values):
+            buf[2 * i] = _CONTROL_COMMAND_CONT
+            buf[2 * i + 1] = value & 0xFF
+        buf[-2] = _CONTROL_COMMAND
+        self._send(buf, len(values))
+        for value in values:
+            self._track(value & 0xFF)
+
+    # обновление теневых копий адреса и таблицы команд по отправленной команде
+    def _track(self, value):
+        # команда определяется старшим установленным битом
+        if value & 0x80:                        # LCD_SETDDRAMADDR
+            self._addr = value & 0x7F
+        elif value & 0xC0 == LCD_SETCGRAMADDR:
+            if not self._ext:                   # при IS=1 - команды расширенной таблицы
+                self._addr = None
+        elif value & 0xE0 == LCD_FUNCTIONSET:
+            self._ext = bool(value & LCD_EX_INSTRUCTION)
+        elif value & 0xF0 == LCD_CURSORSHIFT:
+            # при IS=1 здесь команда LCD_EX_SETBIASOSC
+            if not (self._ext or value & LCD_DISPLAYMOVE) and self._addr is not None:
+                self._addr = self._nextAddr(self._addr, value & LCD_MOVERIGHT)
+        elif value == LCD_CLEARDISPLAY:
+            self._addr = 0
+            self._displaymode |= LCD_ENTRYLEFT
+        elif value == LCD_RETURNHOME:
+            self._addr = 0
+
+    # сдвиг адреса DDRAM после записи данных, с учётом направления текста
+    def _advance(self, data):
+        addr = self._addr
+        if addr is None:
+            return                              # запись идёт в CGRAM
+        forward = self._displaymode & LCD_ENTRYLEFT
+        ddram = self._ddram
+        for c in data:
+            if addr < _DDRAM_ROW_LENGTH:
+                ddram[addr] = c
+            elif 0x40 <= addr < 0x40 + _DDRAM_ROW_LENGTH:
+                ddram[addr - 0x40 + _DDRAM_ROW_LENGTH] = c
+            addr = self._nextAddr(addr, forward)
+        self._addr = addr
+
+    def _nextAddr(self, addr, forward):
+        if self._numlines == 1:
+            return (addr + (1 if forward else -1)) % 80
+        if forward:
+            if addr == 0x27:
+                return 0x40
+            return 0x00 if addr == 0x67 else addr + 1
+        if addr == 0x40:
+            return 0x27
+        return 0x67 if addr == 0x00 else addr - 1
 
     def write(self, value):
-        for character in value:
-            self.writeData(ord(character))
+        self.writeBuf(self._encode(value))
 
     def println(self, value):
-        for character in value:
-            self.writeData(ord(character))
-        self.writeData(0)
\ No newline at end of file
+        self.writeBuf(self._encode(value) + b"\x00")
+
+    def _send(self, buf, ncmds):
+        self._waitReady()
+        with self._i2c:
+            self._i2c.write(buf)
+        self._nbytes += len(buf)
+        self._ncmds += ncmds
+
+    # дисплей занят ms миллисекунд, ждать будет только следующая команда
+    def _setBusy(self, ms):
+        self._busy = True
+        self._busy_until = ticks_add(ticks_ms(), ms + 1)   # +1: ticks_ms округляет вниз
+
+    def _waitReady(self):
+        if self._init_pending:
+            self._completeInit()
+        if self._busy:
+            delay = ticks_diff(self._busy_until, ticks_ms())
+            if delay > 0:
+                time.sleep(delay / 1000)
+            self._busy = False
+
+    def _ddramAddr(self, col, row):
+        if ( row >= self._numlines ) :
+            row = self._numlines-1    # we count rows starting w/0
+        return col + _ROW_OFFSETS[row]
+
+    @staticmethod
+    def _encode(value):
+        if isinstance(value, str):
+            return bytes([ord(c) & 0xFF for c in value])
+        return bytes(value)
\ No newline at end of file
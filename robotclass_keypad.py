@@ -9,6 +9,20 @@
 
 Драйвер клавиатуры МехМод 3X4 от RobotClass
 
+**Пример**
+i2c = board.I2C()
+keypad = RobotClass_KeyPad(i2c)
+
+while True:
+    keypad.update()
+    event = keypad.getEvent()
+    while event:
+        kind, x, y = event
+        if kind == EVENT_PRESS:
+            print("press", x, y)
+        event = keypad.getEvent()
+    time.sleep(0.005)
+
 Исходный код
 https://github.com/robotclass/Circuitpython
 
@@ -23,15 +37,25 @@ https://github.com/robotclass/Circuitpython
 **Зависимости:**
 
 * Библиотека Adafruit's Bus Device: https://github.com/adafruit/Adafruit_CircuitPython_BusDevice
+* Библиотека Adafruit's Ticks: https://github.com/adafruit/Adafruit_CircuitPython_Ticks
 """
 
 __version__ = "0.1"
 
 import time
+from adafruit_ticks import ticks_ms, ticks_add, ticks_diff
 
 _REGISTER_GET_STATE = const(0xA0)
 _REGISTER_SET_LED = const(0xB0)
 
+_EVENT_QUEUE_SIZE = const(16)
+
+# типы событий
+EVENT_PRESS = const(0)
+EVENT_RELEASE = const(1)
+EVENT_LONG_PRESS = const(2)
+EVENT_REPEAT = const(3)
+
 class RobotClass_KeyPad:
     i2c = None
 
@@ -46,6 +70,31 @@ class RobotClass_KeyPad:
         self.cols = cols
         self._i2c = i2c_device.I2CDevice(i2c, address)
 
+        # параметры событий, мс
+        self.debounce = 20          # время устойчивого состояния
+        self.longPress = 800        # удержание до длинного нажатия, 0 - отключено
+        self.repeat = 200           # период повтора после длинного нажатия, 0 - отключено
+        self.overflow = 0           # число событий, не поместившихся в очередь
+
+        # все возможные события создаются заранее, опрос ничего не выделяет
+        # индекс события: тип * число клавиш + номер бита
+        n = rows * cols
+        self._nkeys = n
+        self._events = tuple((kind, b % cols, b // cols) for kind in range(4) for b in range(n))
+        self._queue = bytearray(_EVENT_QUEUE_SIZE)
+        self._q_head = 0
+        self._q_len = 0
+
+        self._cmd = bytearray(3)
+        self._state_buf = bytearray(2)
+        self._read_length = 0       # длина ожидаемого ответа, 0 - запроса нет
+        self._ready_at = 0          # момент готовности ответа (ticks_ms)
+        self._raw = 0               # последнее прочитанное состояние
+        self._raw_time = ticks_ms() # момент его изменения
+        self._stable = 0            # состояние после подавления дребезга
+        self._long = 0              # клавиши, для которых было длинное нажатие
+        self._due = [0] * n         # момент следующего длинного нажатия/повтора
+
     # получение состояния клавиш
     # результат: двухбайтное целое, где биты - состояния клавиш
     def getStateRaw(self):
@@ -69,19 +118,123 @@ class RobotClass_KeyPad:
 
         return state
 
+    # асинхронное получение состояния клавиш
+    async def getStateRawAsync(self):
+        self.startRead(_REGISTER_GET_STATE, 2)
+        data = await self.collectAsync(self._state_buf)
+        return data[0] | (data[1]<<8)
+
+    # опрос клавиатуры и формирование событий, вызывать периодически
+    # изменения ищутся через XOR масок, дребезг подавляется окном debounce
+    # raw - состояние, уже прочитанное через startRead/collect; None - прочитать
+    def update(self, raw: int = None):
+        if raw is None:
+            self.startRead(_REGISTER_GET_STATE, 2)
+            data = self.collect(self._state_buf)
+            raw = data[0] | (data[1] << 8)
+        now = ticks_ms()
+
+        if raw != self._raw:
+            self._raw = raw
+            self._raw_time = now
+        elif raw != self._stable and ticks_diff(now, self._raw_time) >= self.debounce:
+            changed = raw ^ self._stable
+            self._stable = raw
+            self._long &= raw
+            mask = 1
+            for b in range(self._nkeys):
+                if changed & mask:
+                    if raw & mask:
+                        self._push(EVENT_PRESS, b)
+                        self._due[b] = ticks_add(now, self.longPress)
+                    else:
+                        self._push(EVENT_RELEASE, b)
+                mask <<= 1
+
+        if self._stable and self.longPress:
+            mask = 1
+            for b in range(self._nkeys):
+                if (self._stable & mask and ticks_diff(now, self._due[b]) >= 0
+                        and (self.repeat or not self._long & mask)):
+                    if self._long & mask:
+                        self._push(EVENT_REPEAT, b)
+                    else:
+                        self._long |= mask
+                        self._push(EVENT_LONG_PRESS, b)
+                    # следующий повтор отсчитывается от срока, а не от момента опроса
+                    self._due[b] = ticks_add(self._due[b], self.repeat)
+                    if ticks_diff(now, self._due[b]) >= 0:
+                        self._due[b] = ticks_add(now, self.repeat)
+                mask <<= 1
+
+    # следующее событие из очереди
+    # результат: кортеж (тип, x, y) или None
+    def getEvent(self):
+        if not self._q_len:
+            return None
+        idx = self._queue[self._q_head]
+        self._q_head = (self._q_head + 1) % _EVENT_QUEUE_SIZE
+        self._q_len -= 1
+        return self._events[idx]
+
+    def _push(self, kind: int, bit: int) -> None:
+        if self._q_len == _EVENT_QUEUE_SIZE:
+            self.overflow += 1
+            return
+        self._queue[(self._q_head + self._q_len) % _EVENT_QUEUE_SIZE] = kind * self._nkeys + bit
+        self._q_len += 1
+
     # изменение состояния встроенного светодиода
     # state - состояние: 0,1
     def setLed(self, state: int):
         self._write_register_byte(_REGISTER_SET_LED, state)
 
+    # чтение в две фазы: startRead отправляет запрос и освобождает шину,
+    # collect забирает ответ, когда модуль его подготовит (через 1 мс)
+    # между фазами можно опрашивать другие устройства
+    def startRead(self, register: int = _REGISTER_GET_STATE, length: int = 2) -> None:
+        self._cmd[0] = register & 0xFF
+        with self._i2c:
+            self._i2c.write(self._cmd)
+        self._read_length = length
+        self._ready_at = ticks_add(ticks_ms(), 2)   # не меньше 1 мс с учётом округления
+
+    # True, если ответ на запрос startRead уже готов
+    def isReady(self) -> bool:
+        return ticks_diff(ticks_ms(), self._ready_at) >= 0
+
+    # вторая фаза чтения, при необходимости ждёт оставшееся время
+    # buf - буфер для результата, None - создать новый
+    def collect(self, buf: bytearray = None) -> bytearray:
+        if not self._read_length:
+            raise RuntimeError("No read in progress")
+        delay = ticks_diff(self._ready_at, ticks_ms())
+        if delay > 0:
+            time.sleep(delay / 1000)
+        return self._collect(buf)
+
+    async def collectAsync(self, buf: bytearray = None) -> bytearray:
+        import asyncio  # pylint: disable=import-outside-toplevel
+
+        if not self._read_length:
+            raise RuntimeError("No read in progress")
+        delay = ticks_diff(self._ready_at, ticks_ms())
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        return self._collect(buf)
+
+    def _collect(self, buf: bytearray) -> bytearray:
+        if buf is None:
+            buf = bytearray(self._read_length)
+        self._read_length = 0
+        with self._i2c:
+            self._i2c.readinto(buf)
+        return buf
+
     def _read_register(self, register: int, length: int) -> bytearray:
         """Low level register reading over I2C, returns a list of values"""
-        with self._i2c:
-            self._i2c.write(bytes([register & 0xFF, 0x00, 0x00]))
-            time.sleep(0.001)
-            result = bytearray(length)
-            self._i2c.readinto(result)
-            return result
+        self.startRead(register, length)
+        return self.collect()
 
     def _write_register_byte(self, register: int, value: int) -> None:
         """Low level register writing over I2C, writes one 8-bit value"""
@@ -9,6 +9,16 @@
 
 Драйвер светодиодного индикатора Омикрон-16 от RobotClass
 
+**Пример**
+i2c = board.I2C()
+gauge = RobotClass_LedGauge(i2c)
+
+# настройки копятся и отправляются одной серией при выходе из блока,
+# значения, совпадающие с текущими, не отправляются
+with gauge:
+    gauge.setColor(255, 0, 0)
+    gauge.setBrightness(20)
+
 Исходный код
 https://github.com/robotclass/Circuitpython
 
@@ -23,11 +33,15 @@ https://github.com/robotclass/Circuitpython
 **Зависимости:**
 
 * Библиотека Adafruit's Bus Device: https://github.com/adafruit/Adafruit_CircuitPython_BusDevice
+* Библиотека Adafruit's Ticks: https://github.com/adafruit/Adafruit_CircuitPython_Ticks
 """
 
 __version__ = "0.1"
 
 import time
+from adafruit_ticks import ticks_ms, ticks_add, ticks_diff
+
+_WRITE_INTERVAL_MS = const(1)  # модулю нужна 1 мс на обработку записи
 
 CMD_GET_VERSION = const(0xB0)  # версия прошивки
 CMD_GET_SRC = const(0xB1)  # получение источника сигнала
@@ -66,9 +80,34 @@ class RobotClass_LedGauge:
             i2c_device,
         )
         self._i2c = i2c_device.I2CDevice(i2c, address)
+        self._regs = {}             # последние отправленные значения настроек
+        self._pending = {}          # отложенные изменения
+        self._deferred = False
+        self._busy = False          # модуль обрабатывает предыдущую запись
+        self._ready_at = 0          # до этого момента (ticks_ms)
         self._write_register(CMD_INIT, 1)
         self.source = self._read_register(CMD_GET_SRC, 1)[0]
 
+    # отложенная запись: настройки копятся до вызова apply()
+    def defer(self):
+        self._deferred = True
+
+    # отправка накопленных изменений подряд, с минимальным интервалом
+    def apply(self):
+        self._deferred = False
+        pending = self._pending
+        self._pending = {}
+        for register in sorted(pending):
+            self._write_register_buf(register, pending[register])
+            self._regs[register] = pending[register]
+
+    def __enter__(self):
+        self.defer()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.apply()
+
     def test(self):
         self._write_register(CMD_RUN_TEST, 1)
 
@@ -91,31 +130,54 @@ class RobotClass_LedGauge:
         return {'position':pos,'button':btn}
 
     def setMode(self, mode: int):
-        self._write_register(CMD_SET_MODE, mode)
+        self._set_register(CMD_SET_MODE, [mode & 0xFF, 0x00, 0x00])
 
     def setColor(self, r: int, g: int, b: int):
-        self._write_register_buf(CMD_SET_COLOR, [r, g, b])
+        self._set_register(CMD_SET_COLOR, [r & 0xFF, g & 0xFF, b & 0xFF])
 
     def setBrightness(self, brightness: int):
         if brightness < 0 or brightness > 31:
             raise "Bad brightness value"
-        self._write_register(CMD_SET_BRIGHTNESS, brightness)
+        self._set_register(CMD_SET_BRIGHTNESS, [brightness, 0x00, 0x00])
 
     def setEncLimit(self, value: bool):
-        self._write_register(CMD_SET_ENC_LIMIT, value)
+        self._set_register(CMD_SET_ENC_LIMIT, [value & 0xFF, 0x00, 0x00])
 
     def setEncMax(self, value: int):
         if value < 0 or value > 14:
             raise "Bad encoder max value"
-        self._write_register(CMD_SET_ENC_MAX, value)
+        self._set_register(CMD_SET_ENC_MAX, [value, 0x00, 0x00])
 
     def setPotLPF(self, value: int):
         if value < 1 or value > 16:
             raise "Bad potentiometer LPF"
-        self._write_register(CMD_SET_POT_LPF, value)
+        self._set_register(CMD_SET_POT_LPF, [value, 0x00, 0x00])
+
+    def _set_register(self, register: int, values: list) -> None:
+        """Запись настройки, если она отличается от уже отправленной"""
+        if self._regs.get(register) == values:
+            self._pending.pop(register, None)
+        elif self._deferred:
+            self._pending[register] = values
+        else:
+            self._write_register_buf(register, values)
+            self._regs[register] = values
+
+    def _wait_ready(self) -> None:
+        """Ожидание, пока модуль обработает предыдущую запись"""
+        if self._busy:
+            delay = ticks_diff(self._ready_at, ticks_ms())
+            if delay > 0:
+                time.sleep(delay / 1000)
+            self._busy = False
+
+    def _set_busy(self) -> None:
+        self._busy = True
+        self._ready_at = ticks_add(ticks_ms(), _WRITE_INTERVAL_MS + 1)   # +1: ticks_ms округляет вниз
 
     def _read_register(self, register: int, length: int) -> bytearray:
         """Чтение из шины I2C массива байт"""
+        self._wait_ready()
         with self._i2c:
             self._i2c.write(bytes([register & 0xFF, 0x00, 0x00, 0x00]))
             result = bytearray(length)
@@ -124,13 +186,18 @@ class RobotClass_LedGauge:
 
     def _write_register(self, register: int, value: int) -> None:
         """Запись в шину I2C одного байта"""
+        if register == CMD_INIT:
+            self._regs = {}         # настройки сброшены модулем
+            self._pending = {}
+        self._wait_ready()
         with self._i2c:
             self._i2c.write(bytes([register & 0xFF, value & 0xFF, 0x00, 0x00]))
-        time.sleep(0.001)
+        self._set_busy()
 
     def _write_register_buf(self, register: int, values: list) -> None:
         """Запись в шину I2C массива байт"""
         buf = [register & 0xFF] + values
+        self._wait_ready()
         with self._i2c:
             self._i2c.write(bytes(buf))
-        time.sleep(0.001)
\ No newline at end of file
+        self._set_busy()
\ No newline at end of file
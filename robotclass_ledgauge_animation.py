@@ -0,0 +1,229 @@
+# SPDX-FileCopyrightText: 2026 RobotClass
+#
+# SPDX-License-Identifier: MIT
+
+# RobotClass LED gauge Omicron-16 animations
+"""
+`robotclass_ledgauge_animation`
+====================================================
+
+Анимации для светодиодного индикатора Омикрон-16 от RobotClass
+
+Кадр анимации - кортеж (цвет, яркость, режим), где цвет - (r, g, b),
+а None в любом поле означает "не менять". Эффект - объект с методом
+frame(t), возвращающий кадр для момента t (секунды от начала) или None
+по окончании, либо генератор, выдающий кадр на каждом шаге.
+
+Исходный код
+https://github.com/robotclass/Circuitpython
+
+**Пример**
+i2c = board.I2C()
+left = RobotClass_LedGauge(i2c, 0x30)
+right = RobotClass_LedGauge(i2c, 0x31)
+
+anim = GaugeAnimator(fps=50)
+anim.play(left, pulse((255, 0, 0), period=1.0))
+anim.play(right, hueSweep(period=4.0))
+
+while True:
+    anim.tick()
+    # другая работа
+    print(anim.fps, anim.dropped)
+
+Реализация
+--------------------
+
+**Аппаратная часть:**
+
+* `Светодиодный индикатор Омикрон-16
+  <https://shop.robotclass.ru/item/3476>`_
+
+**Зависимости:**
+
+* Драйвер robotclass_ledgauge
+* Библиотека Adafruit's Ticks: https://github.com/adafruit/Adafruit_CircuitPython_Ticks
+"""
+
+__version__ = "0.1"
+
+import time
+from adafruit_ticks import ticks_ms, ticks_add, ticks_diff
+
+
+def _lerp(a, b, f):
+    return int(a + (b - a) * f + 0.5)
+
+
+class Keyframes:
+    # frames - список (t, цвет, яркость, режим), t - секунды по возрастанию
+    # цвет и яркость интерполируются линейно, режим берётся из предыдущего кадра
+    # loop - повторять с начала после последнего кадра
+    def __init__(self, frames: list, loop: bool = False) -> None:
+        if not frames:
+            raise ValueError("No keyframes")
+        self._frames = frames
+        self.loop = loop
+        self.duration = frames[-1][0]
+
+    def frame(self, t: float):
+        frames = self._frames
+        if t > self.duration:
+            if not self.loop:
+                return None
+            t = t % self.duration if self.duration else 0
+        i = 1
+        while i < len(frames) and frames[i][0] < t:
+            i += 1
+        if i == len(frames):
+            return frames[-1][1:]
+
+        t0, color0, bright0, mode0 = frames[i - 1]
+        t1, color1, bright1, _ = frames[i]
+        f = (t - t0) / (t1 - t0) if t1 > t0 else 1
+
+        color = color0
+        if color0 is not None and color1 is not None:
+            color = (_lerp(color0[0], color1[0], f),
+                     _lerp(color0[1], color1[1], f),
+                     _lerp(color0[2], color1[2], f))
+        bright = bright0
+        if bright0 is not None and bright1 is not None:
+            bright = _lerp(bright0, bright1, f)
+        return (color, bright, mode0)
+
+
+# пульсация яркости одним цветом
+def pulse(color: tuple, period: float = 1.0, low: int = 0, high: int = 31) -> Keyframes:
+    half = period / 2
+    return Keyframes([(0, color, low, None), (half, color, high, None), (period, color, low, None)], loop=True)
+
+
+# плавный переход между двумя цветами за duration секунд
+def colorRamp(start: tuple, end: tuple, duration: float, brightness: int = None) -> Keyframes:
+    return Keyframes([(0, start, brightness, None), (duration, end, brightness, None)])
+
+
+# обход цветового круга за period секунд
+def hueSweep(period: float = 4.0, brightness: int = None) -> Keyframes:
+    hues = ((255, 0, 0), (255, 255, 0), (0, 255, 0), (0, 255, 255), (0, 0, 255), (255, 0, 255), (255, 0, 0))
+    step = period / (len(hues) - 1)
+    return Keyframes([(i * step, c, brightness, None) for i, c in enumerate(hues)], loop=True)
+
+
+class GaugeAnimator:
+    # fps - требуемая частота кадров
+    # кадры привязаны к моментам start + n * период, поэтому несколько
+    # индикаторов на одной шине не расходятся и не накапливают ошибку
+    def __init__(self, fps: int = 50) -> None:
+        self._fps = fps
+        self._period = 1000 / fps   # мс
+        self._tracks = []           # [индикатор, эффект, кадр, последний кадр]
+        self._start = None          # ticks_ms кадра 0
+        self._elapsed = 0           # мс, перенесённые из _start в счёт времени
+        self._frame = 0
+        self._shown = False         # кадр _frame уже выведен
+        self.frames = 0             # выведено кадров
+        self.dropped = 0            # пропущено кадров из-за опоздания
+        self.skipped = 0            # не отправлено кадров, совпавших с предыдущим
+        self.writes = 0             # отправлено изменений на индикаторы
+
+    # запуск эффекта на индикаторе, предыдущий эффект индикатора заменяется
+    def play(self, gauge, effect) -> None:
+        self.stop(gauge)
+        if self._start is None:
+            self._start = ticks_ms()
+            self._elapsed = 0
+            self._frame = 0
+            self._shown = False
+            self.frames = 0
+            self.dropped = 0
+            self.skipped = 0
+            self.writes = 0
+        self._tracks.append([gauge, effect, self._frame, None])
+
+    # остановка эффекта на индикаторе, None - на всех
+    def stop(self, gauge=None) -> None:
+        self._tracks = [tr for tr in self._tracks if gauge is not None and tr[0] is not gauge]
+        if not self._tracks:
+            self._start = None
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tracks)
+
+    # фактическая частота кадров с момента запуска
+    @property
+    def fps(self) -> float:
+        if self._start is None or not self.frames:
+            return 0.0
+        elapsed = self._elapsed + ticks_diff(ticks_ms(), self._start)
+        return self.frames * 1000 / elapsed if elapsed > 0 else 0.0
+
+    # вывод очередного кадра, если подошло его время; не блокирует
+    # результат: True, если кадр выведен
+    def tick(self) -> bool:
+        if self._start is None:
+            return False
+        n = int(ticks_diff(ticks_ms(), self._start) / self._period)
+        if n <= self._frame and self._shown:
+            return False
+        if n > self._frame + 1:
+            self.dropped += n - self._frame - 1
+        self._frame = n
+        self._shown = True
+        self.frames += 1
+
+        finished = []
+        for track in self._tracks:
+            gauge, effect, first, last = track
+            if hasattr(effect, "frame"):
+                frame = effect.frame((n - first) * self._period / 1000)
+            else:
+                frame = next(effect, None)
+            if frame is None:
+                finished.append(gauge)
+                continue
+            if frame == last:
+                self.skipped += 1
+                continue
+            self._apply(gauge, frame, last)
+            track[3] = frame
+
+        for gauge in finished:
+            self.stop(gauge)
+        if self._start is not None and n >= self._fps:
+            # отсчёт сдвигается на целую секунду, чтобы ticks_diff не переполнялся
+            self._start = ticks_add(self._start, 1000)
+            self._elapsed += 1000
+            self._frame -= self._fps
+            for track in self._tracks:
+                track[2] -= self._fps
+        return True
+
+    # проигрывание до окончания всех эффектов или duration секунд
+    def run(self, duration: float = None) -> None:
+        if self._start is None:
+            return
+        end = None if duration is None else ticks_add(ticks_ms(), int(duration * 1000))
+        while self._tracks:
+            now = ticks_ms()
+            if end is not None and ticks_diff(now, end) >= 0:
+                break
+            delay = (self._frame + 1) * self._period - ticks_diff(now, self._start)
+            if delay > 0:
+                time.sleep(delay / 1000)
+            self.tick()
+
+    def _apply(self, gauge, frame, last) -> None:
+        color, bright, mode = frame
+        with gauge:
+            if color is not None and (last is None or color != last[0]):
+                gauge.setColor(*color)
+                self.writes += 1
+            if bright is not None and (last is None or bright != last[1]):
+                gauge.setBrightness(bright)
+                self.writes += 1
+            if mode is not None and (last is None or mode != last[2]):
+                gauge.setMode(mode)
+                self.writes += 1
@@ -9,6 +9,19 @@
 
 Драйвер модуля Моторикс от RobotClass
 
+**Пример**
+i2c = board.I2C()
+motors = RobotClass_Motorix(i2c)
+
+# оба мотора меняются за одно обращение к шине, знак - направление
+motors.setMotors(200, -200)
+
+# плавный разгон с ограничением ускорения и рывка
+ramp = MotorRamp(motors, accel=400, jerk=2000, rate=50)
+ramp.setTarget(255, 255)
+while not ramp.done:
+    ramp.update()
+
 Исходный код
 https://github.com/robotclass/Circuitpython
 
@@ -23,10 +36,13 @@ https://github.com/robotclass/Circuitpython
 **Зависимости:**
 
 * Библиотека Adafruit's Bus Device: https://github.com/adafruit/Adafruit_CircuitPython_BusDevice
+* Библиотека Adafruit's Ticks: https://github.com/adafruit/Adafruit_CircuitPython_Ticks
 """
 
 __version__ = "0.1"
 
+from adafruit_ticks import ticks_ms, ticks_add, ticks_diff
+
 FREQ = 8000000
 
 MOTOR_A = const(0)
@@ -44,6 +60,8 @@ class RobotClass_Motorix:
         )
 
         self._i2c = i2c_device.I2CDevice(i2c, address)
+        self._dir = [None, None]    # последние отправленные направления
+        self._pwm = [None, None]    # последние отправленные значения ШИМ
 
     # настройка ШИМ
     # freq - частота
@@ -60,6 +78,7 @@ class RobotClass_Motorix:
     def setPwm(self, motor: int, pwm: int):
         with self._i2c as i2c:
             i2c.write(bytes([CMD_SET_PWM, motor, pwm & 0xFF, (pwm >> 8) & 0xFF]))
+        self._pwm[motor] = pwm
 
 
     # направление вращения
@@ -73,9 +92,143 @@ class RobotClass_Motorix:
             v = 0b10
         with self._i2c as i2c:
             i2c.write(bytes([CMD_SET_DIR, motor, v, 0x00]))
+        self._dir[motor] = v
+
+    # скорость одного мотора со знаком: >0 - вперёд, <0 - назад, 0 - стоп
+    def setSpeed(self, motor: int, speed: int):
+        if motor == MOTOR_A:
+            self.setMotors(speed, None)
+        else:
+            self.setMotors(None, speed)
+
+    # скорости обоих моторов со знаком, None - не менять
+    # протокол не позволяет объединить команды, поэтому все изменившиеся
+    # направления и ШИМ отправляются подряд за один захват шины,
+    # неизменившиеся не отправляются
+    def setMotors(self, speedA: int, speedB: int):
+        frames = []
+        for motor, speed in ((MOTOR_A, speedA), (MOTOR_B, speedB)):
+            if speed is None:
+                continue
+            v = 0b01 if speed > 0 else 0b10 if speed < 0 else 0
+            if v != self._dir[motor]:
+                frames.append(bytes([CMD_SET_DIR, motor, v, 0x00]))
+                self._dir[motor] = v
+        for motor, speed in ((MOTOR_A, speedA), (MOTOR_B, speedB)):
+            if speed is None:
+                continue
+            pwm = abs(speed)
+            if pwm != self._pwm[motor]:
+                frames.append(bytes([CMD_SET_PWM, motor, pwm & 0xFF, (pwm >> 8) & 0xFF]))
+                self._pwm[motor] = pwm
+        if frames:
+            with self._i2c as i2c:
+                for frame in frames:
+                    i2c.write(frame)
 
     # изменение состояния встроенного светодиода
     # state - состояние: 0,1
     def setLed(self, mode: int):
         with self._i2c as i2c:
             i2c.write(bytes([CMD_SET_LED, mode, 0x00, 0x00]))
+
+
+# один шаг профиля скорости длительностью dt
+# accel - предельное изменение скорости в секунду
+# jerk - предельное изменение ускорения в секунду, None - трапециевидный профиль
+# результат: новые скорость и ускорение
+def _rampStep(v: float, a: float, target: float, accel: float, jerk, dt: float):
+    e = target - v
+    if e == 0:
+        return target, 0
+    sign = 1 if e > 0 else -1
+    if jerk is None:
+        step = accel * dt
+        if abs(e) <= step:
+            return target, 0
+        return v + sign * step, sign * accel
+
+    # S-профиль: ускорение начинаем снижать заранее, чтобы выйти на цель с нулевым
+    if a * sign > 0 and abs(e) <= a * a / (2 * jerk):
+        a_want = 0
+    else:
+        a_want = sign * accel
+    da = a_want - a
+    limit = jerk * dt
+    if da > limit:
+        da = limit
+    elif da < -limit:
+        da = -limit
+    a += da
+    v += a * dt
+    if (target - v) * sign <= 0:
+        return target, 0
+    return v, a
+
+
+# профиль разгона от start до target в виде потока (t, скорость)
+# rate - частота точек, Гц; выдаются только точки с изменившейся целой скоростью
+def rampProfile(start: int, target: int, accel: float, jerk=None, rate: int = 50):
+    dt = 1 / rate
+    v = start
+    a = 0
+    t = 0
+    last = start
+    while v != target:
+        v, a = _rampStep(v, a, target, accel, jerk, dt)
+        t += dt
+        speed = int(round(v))
+        if speed != last:
+            last = speed
+            yield (t, speed)
+
+
+class MotorRamp:
+    # плавное изменение скоростей обоих моторов
+    # accel - предельное изменение ШИМ в секунду
+    # jerk - предельное изменение ускорения в секунду, None - трапециевидный профиль
+    # rate - наибольшая частота обновлений каждого мотора по шине, Гц
+    def __init__(self, motorix: RobotClass_Motorix, accel: float, jerk=None, rate: int = 50) -> None:
+        self._motorix = motorix
+        self.accel = accel
+        self.jerk = jerk
+        self._interval = 1000 // rate   # мс
+        self._v = [0, 0]
+        self._a = [0, 0]
+        self._target = [0, 0]
+        self._sent = [0, 0]
+        self._ready_at = [None, None]   # ticks_ms, раньше которого мотор не обновляется
+        self._last = None
+
+    # новые целевые скорости со знаком, None - оставить прежнюю
+    def setTarget(self, speedA: int, speedB: int = None) -> None:
+        if speedA is not None:
+            self._target[MOTOR_A] = speedA
+        if speedB is not None:
+            self._target[MOTOR_B] = speedB
+
+    # True, если обе скорости достигли цели и отправлены
+    @property
+    def done(self) -> bool:
+        return self._sent == self._target
+
+    # расчёт профиля к текущему моменту и отправка изменившихся скоростей
+    # вызывать как можно чаще, не блокирует
+    def update(self) -> bool:
+        now = ticks_ms()
+        dt = 0 if self._last is None else ticks_diff(now, self._last) / 1000
+        self._last = now
+
+        out = [None, None]
+        for m in (MOTOR_A, MOTOR_B):
+            self._v[m], self._a[m] = _rampStep(self._v[m], self._a[m], self._target[m], self.accel, self.jerk, dt)
+            speed = int(round(self._v[m]))
+            ready = self._ready_at[m]
+            if speed != self._sent[m] and (ready is None or ticks_diff(now, ready) >= 0):
+                out[m] = speed
+                self._sent[m] = speed
+                self._ready_at[m] = ticks_add(now, self._interval)
+        if out[MOTOR_A] is None and out[MOTOR_B] is None:
+            return False
+        self._motorix.setMotors(out[MOTOR_A], out[MOTOR_B])
+        return True
@@ -1,5 +1,7 @@
+
 from digitalio import Direction
 from adafruit_bus_device import i2c_device
+from adafruit_ticks import ticks_ms, ticks_add, ticks_diff
 
 # адрес PCA9536
 _PCA9536_ADDRESS = 0x41
@@ -33,15 +35,9 @@ class PCAChannel:
     @inverted.setter
     def inverted(self, inverted: int) -> None:
         self._inverted = inverted
-        
-        invertRegister = self._pca._read_register_byte(_PCA9536_REGISTER_POLARITY_INVERSION)
-
-        # TODO: Break out of here if it's already set correctly
-        invertRegister &= ~(1 << pin)  # Clear pin bit
-        if(inverted):  # Set the bit if it's being set to inverted
-            invertRegister |= (1 << pin)
 
-        self._pca._write_register_byte(_PCA9536_REGISTER_POLARITY_INVERSION, invertRegister)
+        mask = 1 << self._index
+        self._pca._update_register(_PCA9536_REGISTER_POLARITY_INVERSION, mask, mask if inverted else 0)
 
     @property
     def direction(self):
@@ -51,28 +47,17 @@ class PCAChannel:
     def direction(self, mode: int) -> None:
         self._mode = mode
 
-        cfgRegister = self._pca._read_register_byte(_PCA9536_REGISTER_CONFIGURATION)
+        mask = 1 << self._index
+        self._pca._update_register(_PCA9536_REGISTER_CONFIGURATION, mask, mask if mode == Direction.INPUT else 0)
 
-        cfgRegister &= ~(1 << self._index)  # убираем бит
-        if(mode == Direction.INPUT):
-            cfgRegister |= (1 << self._index)
-            
-        self._pca._write_register_byte(_PCA9536_REGISTER_CONFIGURATION, cfgRegister)
-
-    def read(self, value) -> None:
+    def read(self) -> int:
         inputRegister = self._pca._read_register_byte(_PCA9536_REGISTER_INPUT_PORT)
 
         return (inputRegister & (1 << self._index)) >> self._index
 
     def write(self, value):
-        outputRegister = self._pca._read_register_byte(_PCA9536_REGISTER_OUTPUT_PORT)
-
-        # TODO: Break out of here if it's already set correctly
-        outputRegister &= ~(1 << self._index)  # Clear pin bit
-        if(value == True):  # Set the bit if it's being set to HIGH (opposite of Arduino)
-            outputRegister |= (1 << self._index)
-
-        self._pca._write_register_byte(_PCA9536_REGISTER_OUTPUT_PORT, outputRegister)
+        mask = 1 << self._index
+        self._pca._update_register(_PCA9536_REGISTER_OUTPUT_PORT, mask, mask if value else 0)
         
     value = property(read, write)
     
@@ -95,8 +80,37 @@ class PCA9536:
     def __init__(self, i2c: I2C, address: int = _PCA9536_ADDRESS):
         self._i2c = i2c_device.I2CDevice(i2c, address)
 
+        # копии регистров выхода, инверсии и конфигурации, читаются один раз;
+        # дальше запись идёт только при изменении, без чтения-модификации-записи
+        self._registers = bytearray(_PCA9536_REGISTER_INVALID)
+        for register in (_PCA9536_REGISTER_OUTPUT_PORT,
+                         _PCA9536_REGISTER_POLARITY_INVERSION,
+                         _PCA9536_REGISTER_CONFIGURATION):
+            self._registers[register] = self._read_register_byte(register)
+
         self.channels = PCAChannels(self)
 
+    # запись выходов по маске одной транзакцией
+    # mask - изменяемые пины (биты 0-3), value - их новые значения
+    def write_port(self, mask: int, value: int) -> None:
+        self._update_register(_PCA9536_REGISTER_OUTPUT_PORT, mask, value)
+
+    # чтение всех входов одной транзакцией, биты 0-3
+    def read_port(self) -> int:
+        return self._read_register_byte(_PCA9536_REGISTER_INPUT_PORT) & 0x0F
+
+    # снимок всех входов одной транзакцией: кортеж значений пинов 0-3
+    def read_pins(self) -> tuple:
+        port = self.read_port()
+        return tuple((port >> i) & 1 for i in range(_PCA9536_MAX_GPIO + 1))
+
+    def _update_register(self, register, mask, value):
+        cached = self._registers[register]
+        new = (cached & ~mask) | (value & mask)
+        if new != cached:
+            self._write_register_byte(register, new)
+            self._registers[register] = new
+
     def _read_register(self, register, length):
         with self._i2c as i2c:
             i2c.write(bytes([register & 0xFF]))
@@ -112,4 +126,158 @@ class PCA9536:
         buffer[0] = register & 0xFF
         buffer[1] = value & 0xFF
         with self._i2c as i2c:
-            i2c.write(buffer)
\ No newline at end of file
+            i2c.write(buffer)
+
+
+class PCA9536Watcher:
+    """Опрос входов PCA9536 с вызовом обработчиков по фронтам.
+
+    Все входы читаются одной транзакцией. Изменение принимается, если
+    состояние порта продержалось debounce мс. После активности опрос идёт
+    с интервалом min_interval, в покое интервал удваивается до max_interval.
+    """
+
+    def __init__(self, pca: PCA9536, debounce: int = 10,
+                 min_interval: int = 2, max_interval: int = 50) -> None:
+        self._pca = pca
+        self.debounce = debounce
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.interval = min_interval
+        self.polls = 0
+        self._rising = [None] * (_PCA9536_MAX_GPIO + 1)
+        self._falling = [None] * (_PCA9536_MAX_GPIO + 1)
+        self._stable = pca.read_port()
+        self._raw = self._stable
+        self._raw_time = ticks_ms()
+        self._next = self._raw_time
+
+    @property
+    def value(self) -> int:
+        """Состояние входов после подавления дребезга, биты 0-3"""
+        return self._stable
+
+    def on_rising(self, pin: int, callback) -> None:
+        """callback(pin) при переходе 0 -> 1, None - отключить"""
+        self._rising[pin] = callback
+
+    def on_falling(self, pin: int, callback) -> None:
+        """callback(pin) при переходе 1 -> 0, None - отключить"""
+        self._falling[pin] = callback
+
+    def poll(self) -> bool:
+        """Опрос, если подошёл срок; не блокирует. Возвращает True, если был опрос"""
+        now = ticks_ms()
+        if ticks_diff(now, self._next) < 0:
+            return False
+        self.polls += 1
+        raw = self._pca.read_port()
+
+        if raw != self._raw:
+            self._raw = raw
+            self._raw_time = now
+            self.interval = self.min_interval
+        elif raw != self._stable:
+            if ticks_diff(now, self._raw_time) >= self.debounce:
+                changed = raw ^ self._stable
+                self._stable = raw
+                for pin in range(_PCA9536_MAX_GPIO + 1):
+                    bit = 1 << pin
+                    if changed & bit:
+                        callback = self._rising[pin] if raw & bit else self._falling[pin]
+                        if callback:
+                            callback(pin)
+        else:
+            self.interval = min(self.interval * 2, self.max_interval)
+
+        self._next = ticks_add(now, self.interval)
+        return True
+
+    async def run(self) -> None:
+        """Бесконечный опрос в задаче asyncio"""
+        import asyncio  # pylint: disable=import-outside-toplevel
+
+        while True:
+            self.poll()
+            delay = ticks_diff(self._next, ticks_ms())
+            await asyncio.sleep(max(delay, 0) / 1000)
+
+
+class PCA9536Waveform:
+    """Программный ШИМ и последовательности на выходах PCA9536.
+
+    Таблица состояний порта рассчитывается заранее и сжимается: соседние
+    одинаковые шаги объединяются, поэтому на каждое изменение приходится
+    ровно одна запись регистра выхода, а шаги без изменений не передаются.
+    """
+
+    def __init__(self, pca: PCA9536, mask: int = 0x0F) -> None:
+        self._pca = pca
+        self.mask = mask & 0x0F
+        self._runs = []         # [(состояние, число шагов)]
+        self.steps = 0          # число шагов в периоде
+        self.writes = 0         # записей в последнем play()
+        self.rate = 0.0         # достигнутая частота шагов в последнем play()
+
+    def pwm(self, duties: dict, steps: int = 16) -> None:
+        """duties - {пин: заполнение 0..1}, steps - число шагов в периоде"""
+        table = []
+        for step in range(steps):
+            state = 0
+            for pin, duty in duties.items():
+                if step < int(duty * steps + 0.5):
+                    state |= 1 << pin
+            table.append(state)
+        self.pattern(table)
+
+    def pattern(self, states: list) -> None:
+        """states - список 4-битных состояний порта, по одному на шаг"""
+        runs = []
+        for state in states:
+            state &= self.mask
+            if runs and runs[-1][0] == state:
+                runs[-1][1] += 1
+            else:
+                runs.append([state, 1])
+        self._runs = [tuple(r) for r in runs]
+        self.steps = len(states)
+
+    def play(self, rate: float, cycles: int = 1) -> float:
+        """Вывод таблицы cycles раз с частотой rate шагов в секунду.
+
+        Блокирует до окончания. Возвращает достигнутую частоту шагов: если
+        шина не успевает, шаги растягиваются, а не пропускаются.
+        """
+        if not self._runs:
+            return 0.0
+        pca = self._pca
+        period = 1000 / rate       # мс; сроки шагов - от начала, ошибка не копится
+        base = pca._registers[_PCA9536_REGISTER_OUTPUT_PORT] & ~self.mask
+        frames = [bytes([_PCA9536_REGISTER_OUTPUT_PORT, (base | state) & 0xFF]) for state, _ in self._runs]
+        last = pca._registers[_PCA9536_REGISTER_OUTPUT_PORT]
+
+        writes = 0
+        step = 0
+        start = ticks_ms()
+        for _ in range(cycles):
+            for i, (state, count) in enumerate(self._runs):
+                due = ticks_add(start, int(step * period))
+                while ticks_diff(due, ticks_ms()) > 0:
+                    pass
+                value = frames[i][1]
+                if value != last:
+                    with pca._i2c as i2c:
+                        i2c.write(frames[i])
+                    last = value
+                    writes += 1
+                step += count
+        # выдерживаем последний шаг целиком
+        due = ticks_add(start, int(step * period))
+        while ticks_diff(due, ticks_ms()) > 0:
+            pass
+        elapsed = ticks_diff(ticks_ms(), start)
+
+        pca._registers[_PCA9536_REGISTER_OUTPUT_PORT] = last
+        self.writes = writes
+        self.rate = step * 1000 / elapsed if elapsed > 0 else 0.0
+        return self.rate
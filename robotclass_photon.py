@@ -9,6 +9,18 @@
 
 Драйвер дисплея Фотон от RobotClass
 
+**Пример**
+i2c = board.I2C()
+photon = RobotClass_Photon(i2c)
+photon.setPage(1)
+
+while True:
+    # значения копятся, на дисплей уходят только изменившиеся поля
+    photon.updateValue(0, sensor.temperature, 5, 1)
+    photon.updateValue(1, counter)
+    sent, skipped = photon.flush()
+    time.sleep(0.1)
+
 Исходный код
 https://github.com/robotclass/Circuitpython
 
@@ -45,6 +57,8 @@ CMD_SET_PAGE = const(0xC3)
 CMD_GET_VERSION = const(0xD0)
 CMD_GET_PAGE = const(0xD1)
 
+_MAX_STR_LENGTH = const(32)
+
 
 class RobotClass_Photon:
     def __init__(self, i2c: I2C, address: int = 0x25) -> None:
@@ -53,20 +67,78 @@ class RobotClass_Photon:
         )
 
         self._i2c = i2c_device.I2CDevice(i2c, address)
+        self._buf = bytearray(2 + _MAX_STR_LENGTH)
+        self._fields = {}           # (страница, поле) -> последнее отправленное значение
+        self._queued = {}           # (страница, поле) -> значение для flush()
+        self.sent = 0               # полей отправлено последним flush()
+        self.skipped = 0            # полей пропущено последним flush() без изменений
 
     def setValue(self, idx: int, v, width: int = 4, precision: int = 2):
+        self._send(idx, v, width, precision)
+        # страница, на которую попало значение, неизвестна - кэш поля сбрасывается на всех страницах
+        self._fields = {k: f for k, f in self._fields.items() if k[1] != idx}
+
+    def _send(self, idx: int, v, width: int, precision: int) -> bool:
+        buf = self._buf
         if isinstance(v, int):
-            buf = v.to_bytes(4, "little", signed=True)
-            with self._i2c as i2c:
-                i2c.write(bytes([CMD_SET_INT, idx]) + buf)
+            buf[0] = CMD_SET_INT
+            struct.pack_into("<i", buf, 2, v)
+            n = 6
         elif isinstance(v, float):
-            buf = bytearray(struct.pack("f", v))
-            with self._i2c as i2c:
-                i2c.write(bytes([CMD_SET_FLOAT, idx, width, precision]) + buf)
+            buf[0] = CMD_SET_FLOAT
+            buf[2] = width
+            buf[3] = precision
+            struct.pack_into("<f", buf, 4, v)
+            n = 8
         elif isinstance(v, str):
-            buf = bytes(v, "UTF-8")
-            with self._i2c as i2c:
-                i2c.write(bytes([CMD_SET_STR, idx]) + buf)
+            data = bytes(v, "UTF-8")
+            n = 2 + len(data)
+            if n > len(buf):
+                # длинная строка уходит целиком через разовый буфер
+                buf = bytearray(n)
+            buf[0] = CMD_SET_STR
+            buf[2:n] = data
+        else:
+            return False
+        buf[1] = idx
+        with self._i2c as i2c:
+            i2c.write(buf, end=n)
+        return True
+
+    # значение поля для отправки в flush()
+    # повторные вызовы до flush() заменяют значение, отправится последнее
+    # page - страница поля, None - текущая на момент flush()
+    def updateValue(self, idx: int, v, width: int = 4, precision: int = 2, page: int = None):
+        self._queued[(page, idx)] = (v, width, precision)
+
+    # отправка изменившихся полей текущей страницы
+    # страница запрашивается у дисплея: её могли сменить касанием
+    # поля других страниц ждут, пока их страница не станет текущей
+    # результат: (отправлено, пропущено)
+    def flush(self):
+        page = self.getPage()
+        sent = 0
+        skipped = 0
+        for key in [k for k in self._queued if k[0] is None or k[0] == page]:
+            v, width, precision = self._queued.pop(key)
+            field = (page, key[1])
+            value = self._fieldKey(v, width, precision)
+            if self._fields.get(field) == value:
+                skipped += 1
+            elif self._send(key[1], v, width, precision):
+                self._fields[field] = value
+                sent += 1
+        self.sent = sent
+        self.skipped = skipped
+        return (sent, skipped)
+
+    # сброс кэша отправленных значений, например после перезагрузки дисплея
+    # page - страница, None - все
+    def invalidate(self, page: int = None):
+        if page is None:
+            self._fields = {}
+        else:
+            self._fields = {k: v for k, v in self._fields.items() if k[0] != page}
 
     def setPage(self, idx: int):
         with self._i2c as i2c:
@@ -88,4 +160,12 @@ class RobotClass_Photon:
 
     def reset(self):
         with self._i2c as i2c:
-            i2c.write(bytes([CMD_RESET]))
\ No newline at end of file
+            i2c.write(bytes([CMD_RESET]))
+        self._fields = {}
+
+    @staticmethod
+    def _fieldKey(v, width: int, precision: int):
+        if isinstance(v, float):
+            return (float, v, width, precision)
+        return (type(v), v)
+
@@ -0,0 +1,191 @@
+# SPDX-FileCopyrightText: 2026 RobotClass
+#
+# SPDX-License-Identifier: MIT
+
+# RobotClass cooperative fixed-rate scheduler
+"""
+`robotclass_scheduler`
+====================================================
+
+Кооперативный планировщик задач с фиксированной частотой для драйверов RobotClass
+
+Задача запускается по сроку start + n * период от часов ticks_ms,
+поэтому ошибка не накапливается; дробная часть периода в мс переносится
+на следующий срок. Из нескольких готовых задач первой выполняется задача
+с большим приоритетом. Для каждой задачи ведутся гистограммы задержки
+запуска и джиттера периода в мс, счётчики перегрузок и суммарное время
+выполнения задачи. Время занятости шины отдельно не считается: busy -
+это время всей функции задачи, включая расчёты. Точность измерений -
+1 мс, разрешение ticks_ms.
+
+Исходный код
+https://github.com/robotclass/Circuitpython
+
+**Пример**
+i2c = board.I2C()
+motors = RobotClass_Motorix(i2c)
+sonic = RobotClass_UDM(i2c)
+lcd = RobotClass_ST7032(i2c)
+ramp = MotorRamp(motors, accel=400)
+
+sched = Scheduler()
+sched.addTask(ramp.update, 100, priority=2, name="motors")
+sched.addTask(lambda: ramp.setTarget(0 if sonic.getDistance() < 20 else 200), 20, priority=1, name="udm")
+sched.addTask(lcd.flush, 5, name="lcd")
+sched.run(10)
+sched.report()
+
+Реализация
+--------------------
+
+**Зависимости:**
+
+* Библиотека Adafruit's Ticks: https://github.com/adafruit/Adafruit_CircuitPython_Ticks
+"""
+
+__version__ = "0.1"
+
+import time
+from adafruit_ticks import ticks_ms, ticks_add, ticks_diff
+
+HIST_BUCKETS = const(16)   # корзина i: от 2**(i-1) до 2**i мс, корзина 0: меньше 1 мс
+
+
+def _bucket(ms: int) -> int:
+    i = 0
+    while ms > 0 and i < HIST_BUCKETS - 1:
+        ms >>= 1
+        i += 1
+    return i
+
+
+class Task:
+    def __init__(self, func, period: float, priority: int, name: str) -> None:
+        self.func = func
+        self.period = period            # период, мс
+        self.priority = priority
+        self.name = name
+        self.due = 0                    # срок следующего запуска, ticks_ms
+        self.runs = 0                   # число запусков
+        self.overruns = 0               # запусков дольше периода
+        self.missed = 0                 # пропущенных периодов из-за опоздания
+        self.busy = 0                   # суммарное время выполнения, мс
+        self.maxTime = 0                # наибольшее время выполнения, мс
+        self.latency = [0] * HIST_BUCKETS   # задержка запуска относительно срока
+        self.jitter = [0] * HIST_BUCKETS    # отклонение интервала между запусками от периода
+        self._last_start = None
+        self._frac = 0.0                # дробная часть периода, ещё не добавленная к due, мс
+
+    # перенос срока на steps периодов
+    def _advance(self, steps: int) -> None:
+        step = steps * self.period + self._frac
+        whole = int(step)
+        self._frac = step - whole
+        self.due = ticks_add(self.due, whole)
+
+
+class Scheduler:
+    def __init__(self) -> None:
+        self._tasks = []
+        self._start = None
+
+    # добавление задачи
+    # func - вызываемая функция без аргументов
+    # rate - частота запуска, Гц, не больше 1000
+    # priority - приоритет, больше - важнее
+    def addTask(self, func, rate: float, priority: int = 0, name: str = None) -> Task:
+        if not 0 < rate <= 1000:
+            raise ValueError("rate must be 0..1000 Hz")
+        task = Task(func, 1000 / rate, priority, name or getattr(func, "__name__", "task"))
+        task.due = ticks_ms()
+        self._tasks.append(task)
+        return task
+
+    def removeTask(self, task: Task) -> None:
+        self._tasks.remove(task)
+
+    # выполнение одной готовой задачи, не блокирует
+    # результат: выполненная задача или None
+    def tick(self):
+        now = ticks_ms()
+        if self._start is None:
+            self._start = now
+        task = None
+        for t in self._tasks:
+            if ticks_diff(now, t.due) >= 0 and (task is None or t.priority > task.priority
+                                                or (t.priority == task.priority
+                                                    and ticks_diff(t.due, task.due) < 0)):
+                task = t
+        if task is None:
+            return None
+
+        task.latency[_bucket(ticks_diff(now, task.due))] += 1
+        if task._last_start is not None:
+            task.jitter[_bucket(int(abs(ticks_diff(now, task._last_start) - task.period)))] += 1
+        task._last_start = now
+
+        task.func()
+
+        end = ticks_ms()
+        spent = ticks_diff(end, now)
+        task.runs += 1
+        task.busy += spent
+        if spent > task.maxTime:
+            task.maxTime = spent
+        if spent > task.period:
+            task.overruns += 1
+
+        # следующий срок по сетке; пропущенные сроки не выполняются пачкой
+        task._advance(1)
+        late = ticks_diff(end, task.due)
+        if late >= 0:
+            late = int(late / task.period) + 1
+            task.missed += late
+            task._advance(late)
+        return task
+
+    # работа планировщика duration секунд, None - без ограничения
+    # между задачами - сон до ближайшего срока
+    def run(self, duration: float = None) -> None:
+        end = None if duration is None else ticks_add(ticks_ms(), int(duration * 1000))
+        while self._tasks:
+            # срок проверяется на каждом проходе: при перегрузке готовая задача есть всегда
+            if end is not None and ticks_diff(ticks_ms(), end) >= 0:
+                break
+            if self.tick() is not None:
+                continue
+            now = ticks_ms()
+            wait = min(ticks_diff(t.due, now) for t in self._tasks)
+            if end is not None:
+                wait = min(wait, ticks_diff(end, now))
+            if wait > 0:
+                time.sleep(wait / 1000)
+
+    # доля времени, занятая задачей, с первого запуска планировщика
+    def load(self, task: Task) -> float:
+        if self._start is None:
+            return 0.0
+        elapsed = ticks_diff(ticks_ms(), self._start)
+        return task.busy / elapsed if elapsed > 0 else 0.0
+
+    # сводка по задачам
+    def stats(self) -> list:
+        return [{
+            "name": t.name,
+            "runs": t.runs,
+            "overruns": t.overruns,
+            "missed": t.missed,
+            "busy_ms": t.busy,
+            "max_ms": t.maxTime,
+            "load": self.load(t),
+            "latency": t.latency,
+            "jitter": t.jitter,
+        } for t in self._tasks]
+
+    # печать сводки и гистограмм
+    def report(self) -> None:
+        for s in self.stats():
+            print("%s: runs=%d overruns=%d missed=%d busy=%dms max=%dms load=%.1f%%" % (
+                s["name"], s["runs"], s["overruns"], s["missed"], s["busy_ms"], s["max_ms"], s["load"] * 100))
+            print("  latency", s["latency"])
+            print("  jitter ", s["jitter"])
@@ -1,17 +1,86 @@
+import struct
+import time
+
 MAX_PACKET_SIZE = 128
+RX_BUFFER_SIZE = 4096
+MUX_QUANTUM = 32            # байт на единицу веса канала за круг SerialMux
+
+# байты, которые в теле пакета нужно предварять 0x7D
+_ESCAPED = bytes( 1 if c in (0x12, 0x13, 0x7D) else 0 for c in range(256) )
+_ESCAPED_SEPARATE = bytes( 1 if c in (0x10, 0x12, 0x13, 0x7D) else 0 for c in range(256) )
+
+# компактный режим: кадр - COBS( заголовок + номер + значения ) + 0x00
+# заголовок: бит 7 - ключевой кадр, биты 4..6 - режим; номер пакета - байт 0..255
+# значения - zig-zag varint: в ключевом кадре сами значения,
+# в остальных - разность с предыдущим пакетом по каждому каналу
+COMPACT_DELTA = 1
+_KEYFRAME = 0x80
+
+def _cobsEncodeInto( tx, data ):
+    code_pos = 0
+    code = 1
+    n = 1
+    for c in data:
+        if c:
+            tx[n] = c
+            n += 1
+            code += 1
+            if code < 0xFF:
+                continue
+        tx[code_pos] = code
+        code_pos = n
+        code = 1
+        n += 1
+    tx[code_pos] = code
+    tx[n] = 0
+    return n + 1
 
-def _join_bytes( bs ):
-    v = 0
-    x = 0
-    for idx, b in enumerate(bs):
-        v |= (b << (idx<<3))
-    return v
+# результат: исходные байты или None, если кадр повреждён
+def _cobsDecode( data ):
+    out = bytearray()
+    i = 0
+    n = len(data)
+    while i < n:
+        code = data[i]
+        if not code or i + code > n:
+            return None
+        out += data[i+1:i+code]
+        i += code
+        if code < 0xFF and i < n:
+            out.append( 0 )
+    return out
+
+# снятие экранирования 0x7D и, если задан sep, разбиение по неэкранированному sep
+# поиск идёт через bytes.find, а не побайтно
+def _unescape( data, sep ):
+    chunks = []
+    out = bytearray()
+    i = 0
+    n = len(data)
+    while True:
+        j = data.find( b"\x7d", i )
+        k = data.find( bytes([sep]), i, j if j >= 0 else n ) if sep is not None else -1
+        if k >= 0:
+            out += data[i:k]
+            chunks.append( bytes(out) )
+            out = bytearray()
+            i = k + 1
+        elif j >= 0:
+            out += data[i:j]
+            if j + 1 < n:
+                out.append( data[j+1] )
+            i = j + 2
+        else:
+            out += data[i:]
+            chunks.append( bytes(out) )
+            return chunks
 
 class SerialFlow():
     _serial = None
-    _escape = 0
-    _collecting = 0
     _separate = False
+    _schema = None
+    _schema_size = 0
+    _encoding = 0
 
     _p_size = 0
     _v_length = 0
@@ -20,24 +89,78 @@ class SerialFlow():
 
     _vs = []
     _vr = []
-    _vr_val = [0,0,0,0];
-    _cr_idx = 0
 
-    def __init__( self, serial ):
+    def __init__( self, serial, rx_size=RX_BUFFER_SIZE ):
         self._serial = serial
 
+        # принятые, но ещё не разобранные байты: _rx[_rx_pos:_rx_len]
+        self._rx = bytearray( rx_size )
+        self._rx_pos = 0
+        self._rx_len = 0
+        self.rxOverflows = 0
+        self.rxDropped = 0
+
     def close( self ):
         self._serial.close()
 
     def setPacketFormat( self, v_length, p_size, separate ):
+        self._schema = None
+        self._encoding = 0
         self._separate = separate
         self._p_size = p_size if p_size else MAX_PACKET_SIZE
         self._v_length = v_length
         self._vs_idx = 0
         self._vr_idx = 0
 
-        self._vs = [0]*p_size
-        self._vr = [0]*p_size
+        self._vs = [0]*self._p_size
+        self._vr = [0]*self._p_size
+
+        # буферы кадра на худший случай: каждый байт экранирован + разделители
+        self._raw = bytearray( self._p_size * v_length )
+        self._tx = bytearray( 2 + 2*len(self._raw) + self._p_size )
+        self._mask = (1 << (v_length << 3)) - 1
+
+    # типизированный формат пакета: по символу struct на значение
+    # b/B - int8/uint8, h/H - int16/uint16, i/I - int32/uint32, f - float32
+    # например "hhHf"; порядок байт little-endian, разделители не используются
+    # пакет упаковывается и разбирается одним вызовом struct
+    def setPacketSchema( self, fmt ):
+        for c in fmt:
+            if c not in "bBhHiIf":
+                raise ValueError( "Unsupported field type: %s" % c )
+        # в CircuitPython нет struct.Struct: хранится строка формата и её размер
+        schema = "<" + fmt
+        size = struct.calcsize( schema )
+        self.setPacketFormat( 1, len(fmt), False )
+        self._schema = schema
+        self._schema_size = size
+        self._raw = bytearray( size )
+        self._tx = bytearray( 2 + 2*size )
+
+    # компактный режим: varint-кодирование разностей и кадры COBS
+    # включается на обеих сторонах после setPacketFormat/setPacketSchema,
+    # режим separate не используется; schema - только целочисленные поля
+    # keyframe - каждый keyframe-й пакет передаётся целиком, после потери
+    # пакета приёмник отбрасывает разности до ближайшего ключевого кадра;
+    # keyframe меньше периода номера пакета, иначе потеря ровно 256 пакетов
+    # останется незамеченной
+    def setCompactMode( self, keyframe=16 ):
+        if not 0 < keyframe < 256:
+            raise ValueError( "keyframe must be 1..255" )
+        if self._schema is not None:
+            if "f" in self._schema:
+                raise ValueError( "Compact mode supports integer fields only" )
+            width = 5
+        else:
+            width = (self._v_length*8 + 7) // 7
+        self._encoding = COMPACT_DELTA
+        self._keyframe = keyframe
+        self._payload = bytearray( 2 + width*self._p_size )
+        self._tx = bytearray( len(self._payload) + len(self._payload)//254 + 2 )
+        self._tx_prev = None
+        self._tx_seq = 0
+        self._rx_prev = None
+        self._rx_seq = 0
 
     def setPacketValue( self, value ):
         if self._vs_idx < self._p_size:
@@ -45,83 +168,622 @@ class SerialFlow():
             self._vs_idx += 1
 
     def sendPacket( self ):
-        self._serial.write( bytes([0x12]) )
-        for i in range( self._vs_idx ):
-            for b in range( self._v_length ):
-                v = (self._vs[i]>>(b<<3)) & 0xFF
-                if v==0x12 or v==0x13 or v==0x7D or (v==0x10 and self._separate):
-                    self._serial.write( bytes([0x7D]) )
-                self._serial.write( bytes([v]) )
-     
-            # separate values
-            if self._separate and i < self._vs_idx-1:
-                self._serial.write( bytes([0x10]) );
-            
-        self._serial.write( bytes([0x13]) )
+        # весь кадр собирается в буфере и уходит одной записью
+        n = self._frame()
+        self._serial.write( memoryview(self._tx)[:n] )
         self._vs_idx = 0
 
-    def receivePacket( self ):
-        # Reading 1 byte, followed by whatever is left in the
-        # read buffer, as suggested by the developer of PySerial.
-        data = self._serial.read(1)
-        data += self._serial.read(self._serial.in_waiting)
+    # упаковка значений пакета в _raw без экранирования
+    # результат: размер тела в байтах
+    def _pack( self ):
+        if self._schema is not None:
+            # незаданные в этом пакете поля сохраняют прежние значения
+            struct.pack_into( self._schema, self._raw, 0, *self._vs )
+            return self._schema_size
+        vl = self._v_length
+        raw = self._raw
+        mask = self._mask
+        for i in range( self._vs_idx ):
+            raw[i*vl:(i+1)*vl] = (self._vs[i] & mask).to_bytes( vl, "little" )
+        return self._vs_idx * vl
+
+    def _frame( self ):
+        if self._encoding:
+            return self._frameCompact()
+        vl = self._v_length
+        raw = self._raw
+        size = self._pack()
+
+        tx = self._tx
+        tx[0] = 0x12
+        n = 1
+        if not self._separate:
+            # быстрый путь: служебных байтов нет, тело копируется целиком
+            body = memoryview(raw)[:size]
+            if raw.find( b"\x12", 0, size ) < 0 and raw.find( b"\x13", 0, size ) < 0 \
+                    and raw.find( b"\x7d", 0, size ) < 0:
+                tx[1:1+size] = body
+                n += size
+            else:
+                n = self._escapeInto( tx, n, body, _ESCAPED )
+        else:
+            for i in range( self._vs_idx ):
+                n = self._escapeInto( tx, n, memoryview(raw)[i*vl:(i+1)*vl], _ESCAPED_SEPARATE )
+                # separate values
+                if i < self._vs_idx-1:
+                    tx[n] = 0x10
+                    n += 1
+        tx[n] = 0x13
+        return n + 1
 
+    def _frameCompact( self ):
+        if self._schema is not None:
+            # приведение значений к типам полей, как при обычной передаче
+            struct.pack_into( self._schema, self._raw, 0, *self._vs )
+            values = struct.unpack_from( self._schema, self._raw )
+            mask = 0
+        else:
+            mask = self._mask
+            values = [v & mask for v in self._vs[:self._vs_idx]]
+
+        prev = self._tx_prev
+        seq = self._tx_seq
+        key = prev is None or len(prev) != len(values) or seq % self._keyframe == 0
+        buf = self._payload
+        buf[0] = (_KEYFRAME if key else 0) | (COMPACT_DELTA << 4)
+        buf[1] = seq & 0xFF
+        n = 2
+        half = (mask + 1) >> 1
+        for i, v in enumerate( values ):
+            if not key:
+                v -= prev[i]
+                if mask:
+                    # кратчайшая разность по модулю ширины значения
+                    v = ((v + half) & mask) - half
+            v = v << 1 if v >= 0 else (-v << 1) - 1
+            while v > 0x7F:
+                buf[n] = (v & 0x7F) | 0x80
+                n += 1
+                v >>= 7
+            buf[n] = v
+            n += 1
+        self._tx_prev = values
+        self._tx_seq = seq + 1
+        return _cobsEncodeInto( self._tx, memoryview(buf)[:n] )
+
+    @staticmethod
+    def _escapeInto( tx, n, data, table ):
         for c in data:
-            if( self._collecting ):
-                if( self._escape ):
-                    self._vr_val[self._cr_idx] = c
-                    self._cr_idx += 1
-                    self._escape = 0
-                    if not self._separate and self._cr_idx == self._v_length:
-                        self._vr[self._vr_idx] = _join_bytes( self._vr_val )
-                        self._vr_idx += 1
-                        self._cr_idx = 0
-
-                # escape
-                elif c == 0x7D:
-                    self._escape = 1
-
-                # value separator
-                elif self._separate and c == 0x10:
-                    self._vr[self._vr_idx] = _join_bytes( self._vr_val )
-                    self._vr_idx += 1
-                    self._cr_idx = 0
-
-                # end
-                elif c == 0x13:
-                    if( self._separate ):
-                        self._vr[self._vr_idx] = _join_bytes( self._vr_val )
-                        self._vr_idx += 1
-                    self._collecting = 0
-                    return 1
-                else:
-                    self._vr_val[self._cr_idx] = c
-                    self._cr_idx += 1
-                    if not self._separate and self._cr_idx == self._v_length:
-                        self._vr[self._vr_idx] = _join_bytes( self._vr_val )
-                        self._vr_idx += 1
-                        self._cr_idx = 0
-
-            # begin
-            elif c == 0x12:
-                self._collecting = 1
-                self._cr_idx = 0
-                self._vr_idx = 0
-
-        return 0
+            if table[c]:
+                tx[n] = 0x7D
+                n += 1
+            tx[n] = c
+            n += 1
+        return n
+
+    def receivePacket( self ):
+        # сначала пакеты, уже лежащие в буфере, затем чтение из порта:
+        # 1 байт с ожиданием и всё, что осталось в буфере порта,
+        # as suggested by the developer of PySerial
+        values = self._nextPacket()
+        if values is None and self._fill( True ):
+            values = self._nextPacket()
+        if values is None:
+            return 0
+        self._store( values )
+        return 1
+
+    # все полные пакеты из буфера и порта без ожидания
+    # непрочитанный остаток сохраняется до следующего вызова
+    def packets( self ):
+        while True:
+            values = self._nextPacket()
+            if values is None:
+                if not self._fill( False ):
+                    return
+                continue
+            self._store( values )
+            yield values
 
     def receiveByte( self ):
-        # Reading 1 byte, followed by whatever is left in the
-        # read buffer, as suggested by the developer of PySerial.
-        data = self._serial.read(1)
-        data += self._serial.read(self._serial.in_waiting)
-        if len(data):
-            return data[-1]
-        else:
+        self._fill( True )
+        if self._rx_len > self._rx_pos:
+            c = self._rx[self._rx_len-1]
+            self._rx_pos = self._rx_len
+            return c
+        return None
+
+    def _store( self, values ):
+        self._vr[:len(values)] = values
+        self._vr_idx = len(values)
+
+    # чтение из порта в конец буфера, block - ждать хотя бы один байт
+    # результат: число прочитанных байт
+    def _fill( self, block ):
+        rx = self._rx
+        self._compact()
+        got = 0
+        waiting = self._serial.in_waiting
+        if not waiting:
+            if not block:
+                return 0
+            got = self._serial.readinto( memoryview(rx)[self._rx_len:self._rx_len+1] ) or 0
+            self._rx_len += got
+            waiting = self._serial.in_waiting
+        n = min( waiting, len(rx) - self._rx_len )
+        if n:
+            n = self._serial.readinto( memoryview(rx)[self._rx_len:self._rx_len+n] ) or 0
+            self._rx_len += n
+            got += n
+        return got
+
+    # перенос неразобранного остатка в начало буфера
+    def _compact( self ):
+        rx = self._rx
+        if self._rx_pos:
+            rest = self._rx_len - self._rx_pos
+            rx[:rest] = rx[self._rx_pos:self._rx_len]
+            self._rx_pos = 0
+            self._rx_len = rest
+        if self._rx_len == len(rx):
+            # в буфере нет ни одного полного кадра - это мусор
+            self._rx_len = 0
+            self.rxOverflows += 1
+
+    # добавление принятых байт в буфер
+    def _feed( self, data ):
+        pos = 0
+        while pos < len(data):
+            self._compact()
+            n = min( len(data) - pos, len(self._rx) - self._rx_len )
+            self._rx[self._rx_len:self._rx_len+n] = data[pos:pos+n]
+            self._rx_len += n
+            pos += n
+
+    # поиск следующего полного кадра в буфере
+    # результат: список значений или None, если полного кадра нет
+    def _nextPacket( self ):
+        if self._encoding:
+            return self._nextCompact()
+        while True:
+            data = self._nextFrame()
+            if data is None:
+                return None
+            values = self._decode( data )
+            if values is not None:
+                return values
+
+    # следующее полное тело кадра из буфера, ещё с экранированием
+    def _nextFrame( self ):
+        rx = self._rx
+        length = self._rx_len
+        start = rx.find( b"\x12", self._rx_pos, length )
+        if start < 0:
+            self._rx_pos = length
+            return None
+        end = self._findUnescaped( 0x13, start+1, length )
+        if end < 0:
+            self._rx_pos = start
+            return None
+        # начало нового кадра внутри - предыдущий оборван
+        s = self._findUnescaped( 0x12, start+1, end )
+        while s >= 0:
+            start = s
+            s = self._findUnescaped( 0x12, start+1, end )
+        self._rx_pos = end + 1
+        return bytes( memoryview(rx)[start+1:end] )
+
+    def _nextCompact( self ):
+        rx = self._rx
+        pos = self._rx_pos
+        while True:
+            end = rx.find( b"\x00", pos, self._rx_len )
+            if end < 0:
+                self._rx_pos = pos
+                return None
+            start = pos
+            pos = end + 1
+            self._rx_pos = pos
+            if end > start:
+                data = _cobsDecode( bytes( memoryview(rx)[start:end] ) )
+                values = self._decodeCompact( data ) if data else None
+                if values is not None:
+                    return values
+                self.rxDropped += 1
+
+    def _decodeCompact( self, data ):
+        header = data[0]
+        if (header >> 4) & 0x07 != COMPACT_DELTA or len(data) < 2:
+            return None
+        key = header & _KEYFRAME
+        seq = data[1]
+        prev = self._rx_prev
+        if not key and (prev is None or seq != (self._rx_seq + 1) & 0xFF):
+            self._rx_prev = None                # пакет потерян, ждём ключевой кадр
             return None
 
+        values = []
+        v = 0
+        shift = 0
+        for c in memoryview(data)[2:]:
+            v |= (c & 0x7F) << shift
+            if c & 0x80:
+                shift += 7
+                continue
+            values.append( -((v + 1) >> 1) if v & 1 else v >> 1 )
+            v = 0
+            shift = 0
+        if shift or len(values) > self._p_size or (not key and len(values) != len(prev)):
+            return None
+
+        if not key:
+            if self._schema is not None:
+                values = [p + d for p, d in zip( prev, values )]
+            else:
+                mask = self._mask
+                values = [(p + d) & mask for p, d in zip( prev, values )]
+        self._rx_prev = tuple( values )
+        self._rx_seq = seq
+        return values
+
+    def _findUnescaped( self, c, start, end ):
+        rx = self._rx
+        sub = bytes([c])
+        i = rx.find( sub, start, end )
+        while i >= 0:
+            # байт экранирован, если перед ним нечётное число 0x7D
+            j = i - 1
+            while j >= start and rx[j] == 0x7D:
+                j -= 1
+            if not (i - 1 - j) & 1:
+                return i
+            i = rx.find( sub, i+1, end )
+        return -1
+
+    # разбор тела кадра в список значений
+    def _decode( self, data ):
+        vl = self._v_length
+        if self._schema is not None:
+            if b"\x7d" in data:
+                data = _unescape( data, None )[0]
+            if len(data) != self._schema_size:
+                return None                     # повреждённый кадр
+            values = list( struct.unpack_from( self._schema, data ) )
+        elif self._separate:
+            chunks = _unescape( data, 0x10 )
+            values = [int.from_bytes( ch, "little" ) for ch in chunks[:self._p_size]]
+        else:
+            if b"\x7d" in data:
+                data = _unescape( data, None )[0]
+            n = min( len(data) // vl, self._p_size )
+            values = [int.from_bytes( data[i*vl:(i+1)*vl], "little" ) for i in range(n)]
+        return values
+
     def getPacketValue( self, idx ):
         return self._vr[idx]
 
     def listPacketValues( self ):
         return self._vr[:self._p_size]
+
+
+class AsyncSerialFlow( SerialFlow ):
+    """SerialFlow для asyncio поверх пары StreamReader/StreamWriter.
+
+    Формат кадров тот же, что у SerialFlow. Приём: async for values in flow.
+    Передача: await flow.send(values); кадры стоят в очереди ограниченной
+    длины, и send() ждёт, пока в ней не освободится место.
+    """
+
+    def __init__( self, reader, writer, queue_size=16 ):
+        super().__init__( None )
+        self._reader = reader
+        self._writer = writer
+        self._queue_size = queue_size
+        self._queue = None
+        self._sender = None
+
+    # поток поверх сокета, например одного конца socket.socketpair()
+    @classmethod
+    async def fromSocket( cls, sock, queue_size=16 ):
+        import asyncio  # pylint: disable=import-outside-toplevel
+
+        reader, writer = await asyncio.open_connection( sock=sock )
+        return cls( reader, writer, queue_size )
+
+    # поток поверх файлового дескриптора терминала: последовательный порт
+    # в режиме raw или ведущая сторона pty
+    @classmethod
+    async def fromFd( cls, fd, queue_size=16 ):
+        import asyncio  # pylint: disable=import-outside-toplevel
+        import os  # pylint: disable=import-outside-toplevel
+
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader()
+        await loop.connect_read_pipe( lambda: asyncio.StreamReaderProtocol( reader ),
+                                      os.fdopen( fd, "rb", 0, closefd=False ) )
+        transport, protocol = await loop.connect_write_pipe( lambda: asyncio.StreamReaderProtocol( asyncio.StreamReader() ),
+                                                             os.fdopen( fd, "wb", 0, closefd=False ) )
+        writer = asyncio.StreamWriter( transport, protocol, reader, loop )
+        return cls( reader, writer, queue_size )
+
+    def sendPacket( self ):
+        raise RuntimeError( "Use await send()" )
+
+    # постановка пакета в очередь передачи, ждёт при заполненной очереди
+    async def send( self, values ):
+        import asyncio  # pylint: disable=import-outside-toplevel
+
+        if self._queue is None:
+            self._queue = asyncio.Queue( self._queue_size )
+            self._sender = asyncio.create_task( self._sendLoop() )
+        elif self._sender.done():
+            self._sender.result()               # ошибка передачи
+            raise RuntimeError( "Sender stopped" )
+
+        for v in values:
+            self.setPacketValue( v )
+        n = self._frame()
+        self._vs_idx = 0
+        await self._queue.put( bytes( memoryview(self._tx)[:n] ) )
+
+    async def _sendLoop( self ):
+        while True:
+            frame = await self._queue.get()
+            self._writer.write( frame )
+            await self._writer.drain()
+            self._queue.task_done()
+
+    def __aiter__( self ):
+        return self
+
+    async def __anext__( self ):
+        while True:
+            values = self._nextPacket()
+            if values is not None:
+                self._store( values )
+                return values
+            # читается не больше свободного места, чтобы не переполнить буфер
+            self._compact()
+            data = await self._reader.read( len(self._rx) - self._rx_len )
+            if not data:
+                raise StopAsyncIteration
+            self._feed( data )
+
+    # ожидание отправки очереди и закрытие потока
+    async def aclose( self ):
+        if self._queue is not None:
+            await self._queue.join()
+            self._sender.cancel()
+        self._writer.close()
+        await self._writer.wait_closed()
+
+    def close( self ):
+        self._writer.close()
+
+
+class SerialChannel( SerialFlow ):
+    """Логический канал SerialMux со своим форматом пакета и очередями.
+
+    sendPacket() ставит пакет в очередь передачи канала, receivePacket()
+    и packets() берут пакеты из очереди приёма, заполняемой SerialMux.poll().
+    """
+
+    def __init__( self, mux, cid, weight, queue_size ):
+        super().__init__( None, 0 )
+        self._mux = mux
+        self.id = cid
+        self.weight = weight
+        self.queueSize = queue_size
+        self._head = bytes( [0x12, 0x7D, cid] if _ESCAPED_SEPARATE[cid] else [0x12, cid] )
+        self._txq = []
+        self._rxq = []
+        self._deficit = 0
+
+        self.txPackets = 0
+        self.txBytes = 0
+        self.txDropped = 0              # пакетов отклонено при полной очереди передачи
+        self.txMaxDepth = 0
+        self.rxPackets = 0
+        self.rxBytes = 0
+        self.rxDropped = 0              # повреждённых кадров и вытесненных из очереди приёма
+        self.rxMaxDepth = 0
+
+    def close( self ):
+        self._mux.removeChannel( self )
+
+    def setCompactMode( self, keyframe=16 ):
+        raise ValueError( "Compact mode is not supported on channels" )
+
+    # постановка пакета в очередь передачи
+    # результат: False, если очередь заполнена и пакет отброшен
+    def sendPacket( self ):
+        n = self._frame()
+        self._vs_idx = 0
+        if len(self._txq) >= self.queueSize:
+            self.txDropped += 1
+            return False
+        self._txq.append( self._head + self._tx[1:n] )
+        if len(self._txq) > self.txMaxDepth:
+            self.txMaxDepth = len(self._txq)
+        return True
+
+    def receivePacket( self ):
+        if not self._rxq:
+            self._mux.poll()
+        if not self._rxq:
+            return 0
+        self._store( self._rxq.pop( 0 ) )
+        return 1
+
+    def packets( self ):
+        self._mux.poll()
+        while self._rxq:
+            values = self._rxq.pop( 0 )
+            self._store( values )
+            yield values
+
+    def receiveByte( self ):
+        raise RuntimeError( "Not supported on channels" )
+
+    @property
+    def txDepth( self ):
+        return len(self._txq)
+
+    @property
+    def rxDepth( self ):
+        return len(self._rxq)
+
+    def _deliver( self, data, size ):
+        values = self._decode( data )
+        if values is None:
+            self.rxDropped += 1
+            return
+        if len(self._rxq) >= self.queueSize:
+            self._rxq.pop( 0 )          # устаревший пакет уступает место новому
+            self.rxDropped += 1
+        self._rxq.append( values )
+        self.rxPackets += 1
+        self.rxBytes += size
+        if len(self._rxq) > self.rxMaxDepth:
+            self.rxMaxDepth = len(self._rxq)
+
+
+class SerialMux( SerialFlow ):
+    """Несколько логических каналов поверх одного SerialFlow-соединения.
+
+    Кадр канала - обычный кадр SerialFlow, первый байт тела которого -
+    номер канала 0..255. У каждого канала свой формат пакета и свои
+    очереди. Передача идёт по очереди между каналами (deficit round robin):
+    за круг канал получает weight * MUX_QUANTUM байт, поэтому поток
+    пакетов одного канала не задерживает остальные дольше одного круга.
+
+    **Пример**
+    mux = SerialMux( serial.Serial( "/dev/ttyUSB0", 115200, timeout=0 ) )
+    motors = mux.addChannel( 1, weight=4 )
+    motors.setPacketFormat( 2, 4, False )
+    status = mux.addChannel( 2 )
+    status.setPacketSchema( "BHf" )
+
+    while True:
+        motors.setPacketValue( speed_a )
+        motors.setPacketValue( speed_b )
+        motors.sendPacket()
+        mux.poll()
+        for values in status.packets():
+            print( values )
+    """
+
+    def __init__( self, serial ):
+        super().__init__( serial )
+        self._channels = {}
+        self._order = []
+        self._next = 0                  # канал, с которого продолжается круг передачи
+        self._resume = False            # квант этого канала в текущем круге уже выдан
+        self._start = time.monotonic_ns()
+        self.rxUnknown = 0              # кадров для неизвестных каналов
+
+    # добавление канала cid 0..255
+    # weight - доля пропускной способности относительно других каналов
+    # queue_size - предельная длина очередей передачи и приёма, пакетов
+    def addChannel( self, cid, weight=1, queue_size=8 ):
+        if cid in self._channels:
+            raise ValueError( "Channel %d already exists" % cid )
+        channel = SerialChannel( self, cid, weight, queue_size )
+        self._channels[cid] = channel
+        self._order.append( channel )
+        return channel
+
+    def removeChannel( self, channel ):
+        del self._channels[channel.id]
+        self._order.remove( channel )
+        self._next = 0
+        self._resume = False
+
+    def channel( self, cid ):
+        return self._channels[cid]
+
+    # отправка очередей каналов и разбор принятых кадров, не ждёт
+    # max_bytes - предел байт на отправку за вызов, None - без предела
+    # результат: отправлено байт
+    def poll( self, max_bytes=None ):
+        sent = self._send( max_bytes )
+        while True:
+            while True:
+                data = self._nextFrame()
+                if data is None:
+                    break
+                self._dispatch( data )
+            if not self._fill( False ):
+                break
+        return sent
+
+    # всё, что накопилось в очередях, уходит одной записью
+    def _send( self, max_bytes ):
+        out = bytearray()
+        order = self._order
+        budget = max_bytes
+        while any( ch._txq for ch in order ):
+            ch = order[self._next]
+            if not ch._txq:
+                ch._deficit = 0
+            else:
+                if not self._resume:
+                    ch._deficit += ch.weight * MUX_QUANTUM
+                self._resume = False
+                while ch._txq and len(ch._txq[0]) <= ch._deficit:
+                    frame = ch._txq[0]
+                    if budget is not None and len(frame) > budget:
+                        # продолжение с этого канала в следующем вызове
+                        self._resume = True
+                        if out:
+                            self._serial.write( out )
+                        return len(out)
+                    ch._txq.pop( 0 )
+                    ch._deficit -= len(frame)
+                    ch.txPackets += 1
+                    ch.txBytes += len(frame)
+                    out += frame
+                    if budget is not None:
+                        budget -= len(frame)
+            self._next = (self._next + 1) % len(order)
+        if out:
+            self._serial.write( out )
+        return len(out)
+
+    def _dispatch( self, data ):
+        if data[0] == 0x7D and len(data) > 1:
+            cid = data[1]
+            body = data[2:]
+        else:
+            cid = data[0]
+            body = data[1:]
+        channel = self._channels.get( cid )
+        if channel is None:
+            self.rxUnknown += 1
+            return
+        channel._deliver( body, len(data) + 2 )
+
+    # счётчики каналов; скорости - байт/с с момента создания или reset
+    def stats( self ):
+        elapsed = (time.monotonic_ns() - self._start) / 1000000000
+        return [{
+            "id": ch.id,
+            "tx_packets": ch.txPackets,
+            "tx_bytes": ch.txBytes,
+            "tx_rate": ch.txBytes / elapsed if elapsed > 0 else 0.0,
+            "tx_depth": ch.txDepth,
+            "tx_max_depth": ch.txMaxDepth,
+            "tx_dropped": ch.txDropped,
+            "rx_packets": ch.rxPackets,
+            "rx_bytes": ch.rxBytes,
+            "rx_rate": ch.rxBytes / elapsed if elapsed > 0 else 0.0,
+            "rx_depth": ch.rxDepth,
+            "rx_max_depth": ch.rxMaxDepth,
+            "rx_dropped": ch.rxDropped,
+        } for ch in self._order]
+
+    def resetStats( self ):
+        self._start = time.monotonic_ns()
+        for ch in self._order:
+            ch.txPackets = ch.txBytes = ch.txDropped = ch.txMaxDepth = 0
+            ch.rxPackets = ch.rxBytes = ch.rxDropped = ch.rxMaxDepth = 0
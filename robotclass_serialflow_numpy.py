@@ -0,0 +1,210 @@
+# SPDX-FileCopyrightText: 2026 RobotClass
+#
+# SPDX-License-Identifier: MIT
+
+# RobotClass SerialFlow capture decoder for NumPy
+"""
+`robotclass_serialflow_numpy`
+====================================================
+
+Пакетный разбор записанного потока SerialFlow на компьютере
+
+Поток байт, записанный с порта, разбирается целиком средствами NumPy:
+поиск экранированных байт, границ кадров и снятие экранирования выполняются
+векторно, без цикла по байтам. Запись читается кусками по chunk_size байт,
+поэтому память не зависит от длины записи. Поддерживается формат пакета
+без разделителей (separate=False), как в setPacketFormat, и типизированный
+формат, как в setPacketSchema. Кадры с меньшим числом значений
+отбрасываются и считаются в rejected.
+
+Исходный код
+https://github.com/robotclass/Circuitpython
+
+**Пример**
+values = decodeFile( "robot.log", v_length=2, p_size=4 )
+print( values.shape )           # (пакетов, 4)
+
+for block in iterFile( "robot.log", schema="hhHf" ):
+    print( block["f3"].mean() )
+
+Реализация
+--------------------
+
+**Зависимости:**
+
+* NumPy: https://numpy.org
+"""
+
+__version__ = "0.1"
+
+import mmap
+
+import numpy as np
+
+CHUNK_SIZE = 1 << 20
+
+_SCHEMA_TYPES = { "b": "i1", "B": "u1", "h": "<i2", "H": "<u2", "i": "<i4", "I": "<u4", "f": "<f4" }
+
+
+# тип элемента результата: для schema - структура с полями f0, f1, ...
+def captureDtype( v_length=None, schema=None ):
+    if schema is not None:
+        for c in schema:
+            if c not in _SCHEMA_TYPES:
+                raise ValueError( "Unsupported field type: %s" % c )
+        return np.dtype( [("f%d" % i, _SCHEMA_TYPES[c]) for i, c in enumerate( schema )] )
+    if v_length in (1, 2, 4, 8):
+        return np.dtype( "<u%d" % v_length )
+    return np.dtype( np.uint64 )
+
+
+# для каждой позиции из pos: есть ли она в упорядоченном массиве sorted_pos
+def _isIn( pos, sorted_pos ):
+    if not len(sorted_pos):
+        return np.zeros( len(pos), bool )
+    i = np.minimum( np.searchsorted( sorted_pos, pos ), len(sorted_pos) - 1 )
+    return sorted_pos[i] == pos
+
+
+class CaptureDecoder():
+    """Потоковый разбор: feed( data ) возвращает пакеты из полных кадров,
+    незавершённый кадр в конце ждёт следующего куска."""
+
+    def __init__( self, v_length=1, p_size=0, schema=None, max_tail=CHUNK_SIZE ):
+        if not schema and not 0 < v_length <= 8:
+            raise ValueError( "v_length must be 1..8" )
+        if not schema and p_size < 1:
+            # без schema длина пакета задаётся явно: кадры короче p_size отбрасываются
+            raise ValueError( "p_size must be set when schema is not given" )
+        self._dtype = captureDtype( v_length, schema )
+        self._schema = schema
+        self._v_length = v_length
+        self._p_size = p_size
+        self._size = self._dtype.itemsize if schema else v_length * p_size
+        # хвост должен вмещать хотя бы один кадр с полным экранированием
+        self._max_tail = max( max_tail, 4 + 4*self._size )
+        self._tail = np.zeros( 0, np.uint8 )
+        self.frames = 0             # найдено полных кадров
+        self.rejected = 0           # кадров неверной длины
+        self.discarded = 0          # байт вне кадров и из оборванных кадров
+
+    # результат: 2-D массив (пакеты x значения) или 1-D структурный массив для schema
+    def feed( self, data ):
+        buf = np.frombuffer( data, np.uint8 )
+        if len(self._tail):
+            buf = np.concatenate( (self._tail, buf) )
+        n = len(buf)
+        if not n:
+            return self._empty()
+        # байт экранирован, если перед ним нечётная серия 0x7D: в каждой серии
+        # экранируют чётные по счёту 0x7D; обрабатываются только позиции 0x7D
+        esc = np.flatnonzero( buf == 0x7D )
+        if len(esc):
+            run = np.zeros( len(esc), np.intp )
+            brk = np.flatnonzero( np.diff( esc ) != 1 ) + 1
+            run[brk] = brk
+            offset = np.arange( len(esc) ) - np.maximum.accumulate( run )
+            escaper = esc[(offset & 1) == 0]
+        else:
+            escaper = esc
+        escaped = escaper + 1
+
+        ends = np.flatnonzero( buf == 0x13 )
+        ends = ends[~_isIn( ends, escaped )]
+        # вне кадра первый 0x12 - всегда начало, внутри - только неэкранированный
+        sync = np.flatnonzero( buf == 0x12 )
+        first = np.searchsorted( sync, np.concatenate( ([0], ends + 1) ) )
+        first = first[first < len(sync)]
+        forced = np.zeros( len(sync), bool )
+        forced[first] = True
+        starts = sync[forced | ~_isIn( sync, escaped )]
+
+        # кадр - от последнего начала перед концом; конец без нового начала после
+        # предыдущего конца не образует кадра, как и в SerialFlow._nextFrame
+        k = np.searchsorted( starts, ends ) - 1
+        valid = k >= 0
+        s = starts[np.maximum( k, 0 )] if len(starts) else k
+        prev_end = np.empty( len(ends), np.int64 )
+        if len(ends):
+            prev_end[0] = -1
+            prev_end[1:] = ends[:-1]
+        valid &= s > prev_end
+        s = s[valid]
+        e = ends[valid]
+
+        # хвост после последнего конца переходит в следующий кусок;
+        # после неэкранированного 0x13 серия 0x7D всегда чётная
+        cut = int( ends[-1] ) + 1 if len(ends) else 0
+        tail = buf[cut:]
+        if len(tail) > self._max_tail:
+            # слишком длинный хвост без конца кадра - мусор
+            self.discarded += len(tail)
+            tail = tail[:0]
+        self._tail = tail.copy()
+        self.frames += len(s)
+
+        # снятие экранирования: позиция в body = позиция - число 0x7D-экранов перед ней
+        body = np.delete( buf, escaper )
+        first = s + 1 - np.searchsorted( escaper, s + 1 )
+        length = e - np.searchsorted( escaper, e ) - first
+        self.discarded += cut - int( (e - s + 1).sum() )
+
+        # как в SerialFlow: лишние значения отбрасываются, для schema длина точная
+        ok = length == self._size if self._schema else length >= self._size
+        self.rejected += int( len(ok) - ok.sum() )
+        first = first[ok]
+        if not len(first):
+            return self._empty()
+        rows = body[first[:, None] + np.arange( self._size )]
+        return self._values( rows )
+
+    def _values( self, rows ):
+        if self._schema:
+            return rows.view( self._dtype ).reshape( -1 )
+        vl = self._v_length
+        if self._dtype.itemsize == vl:
+            return rows.view( self._dtype )
+        # нестандартная ширина значения: сборка little-endian вручную
+        cols = rows.reshape( len(rows), self._p_size, vl ).astype( np.uint64 )
+        shifts = np.arange( vl, dtype=np.uint64 ) * np.uint64( 8 )
+        return (cols << shifts).sum( axis=2, dtype=np.uint64 )
+
+    def _empty( self ):
+        if self._schema:
+            return np.zeros( 0, self._dtype )
+        return np.zeros( (0, self._p_size), self._dtype )
+
+
+# пакеты из bytes, bytearray, memoryview или mmap кусками по chunk_size байт
+def iterCapture( data, v_length=1, p_size=0, schema=None, chunk_size=CHUNK_SIZE ):
+    decoder = CaptureDecoder( v_length, p_size, schema, chunk_size )
+    view = memoryview( data )
+    for pos in range( 0, len(view), chunk_size ):
+        values = decoder.feed( view[pos:pos+chunk_size] )
+        if len(values):
+            yield values
+
+
+# разбор записи целиком, результат - один массив
+def decodeCapture( data, v_length=1, p_size=0, schema=None, chunk_size=CHUNK_SIZE ):
+    blocks = list( iterCapture( data, v_length, p_size, schema, chunk_size ) )
+    if not blocks:
+        return CaptureDecoder( v_length, p_size, schema )._empty()
+    return np.concatenate( blocks )
+
+
+# то же для файла, файл отображается в память и читается по кускам
+def iterFile( path, v_length=1, p_size=0, schema=None, chunk_size=CHUNK_SIZE ):
+    with open( path, "rb" ) as f:
+        if not f.seek( 0, 2 ):
+            return
+        with mmap.mmap( f.fileno(), 0, access=mmap.ACCESS_READ ) as mm:
+            for values in iterCapture( mm, v_length, p_size, schema, chunk_size ):
+                yield values
+
+
+def decodeFile( path, v_length=1, p_size=0, schema=None, chunk_size=CHUNK_SIZE ):
+    blocks = list( iterFile( path, v_length, p_size, schema, chunk_size ) )
+    if not blocks:
+        return CaptureDecoder( v_length, p_size, schema )._empty()
+    return np.concatenate( blocks )
@@ -21,6 +21,12 @@ while True:
     print("dist = %d" % data)
     time.sleep(0.1)
 
+**Опрос нескольких датчиков без простоя**
+for s in sonics:
+    s.startRead()
+for s in sonics:
+    data = s.collect()
+
 Реализация
 --------------------
 
@@ -32,11 +38,13 @@ while True:
 **Зависимости:**
 
 * Библиотека Adafruit's Bus Device: https://github.com/adafruit/Adafruit_CircuitPython_BusDevice
+* Библиотека Adafruit's Ticks: https://github.com/adafruit/Adafruit_CircuitPython_Ticks
 """
 
 __version__ = "0.1"
 
 import time
+from adafruit_ticks import ticks_ms, ticks_add, ticks_diff
 
 _REGISTER_GET_SENSOR = const(0xB0)
 _REGISTER_GET_VERSION = const(0xB1)
@@ -50,12 +58,20 @@ class RobotClass_UDM:
             i2c_device,
         )
         self._i2c = i2c_device.I2CDevice(i2c, address)
+        self._cmd = bytearray(1)
+        self._read_length = 0       # длина ожидаемого ответа, 0 - запроса нет
+        self._ready_at = 0          # момент готовности ответа (ticks_ms)
 
     def getDistance(self):
         data = self._read_register(_REGISTER_GET_SENSOR, 2);
         v = data[0] | (data[1]<<8)
         return  v
 
+    async def getDistanceAsync(self):
+        self.startRead(_REGISTER_GET_SENSOR, 2)
+        data = await self.collectAsync()
+        return data[0] | (data[1]<<8)
+
     def getVersion(self):
         data = self._read_register(_REGISTER_GET_VERSION, 2);
         v = data[0]
@@ -67,14 +83,52 @@ class RobotClass_UDM:
     def filterUnset(self, state: int):
         self._write_register_byte(_REGISTER_SET_FILTER, 0)
 
+    # чтение в две фазы: startRead отправляет запрос и освобождает шину,
+    # collect забирает ответ, когда модуль его подготовит (через 1 мс)
+    # между фазами можно опрашивать другие устройства
+    def startRead(self, register: int = _REGISTER_GET_SENSOR, length: int = 2) -> None:
+        self._cmd[0] = register & 0xFF
+        with self._i2c:
+            self._i2c.write(self._cmd)
+        self._read_length = length
+        self._ready_at = ticks_add(ticks_ms(), 2)   # не меньше 1 мс с учётом округления
+
+    # True, если ответ на запрос startRead уже готов
+    def isReady(self) -> bool:
+        return ticks_diff(ticks_ms(), self._ready_at) >= 0
+
+    # вторая фаза чтения, при необходимости ждёт оставшееся время
+    # buf - буфер для результата, None - создать новый
+    def collect(self, buf: bytearray = None) -> bytearray:
+        if not self._read_length:
+            raise RuntimeError("No read in progress")
+        delay = ticks_diff(self._ready_at, ticks_ms())
+        if delay > 0:
+            time.sleep(delay / 1000)
+        return self._collect(buf)
+
+    async def collectAsync(self, buf: bytearray = None) -> bytearray:
+        import asyncio  # pylint: disable=import-outside-toplevel
+
+        if not self._read_length:
+            raise RuntimeError("No read in progress")
+        delay = ticks_diff(self._ready_at, ticks_ms())
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        return self._collect(buf)
+
+    def _collect(self, buf: bytearray) -> bytearray:
+        if buf is None:
+            buf = bytearray(self._read_length)
+        self._read_length = 0
+        with self._i2c:
+            self._i2c.readinto(buf)
+        return buf
+
     def _read_register(self, register: int, length: int) -> bytearray:
         """Low level register reading over I2C, returns a list of values"""
-        with self._i2c:
-            self._i2c.write(bytes([register & 0xFF]))
-            time.sleep(0.001)
-            result = bytearray(length)
-            self._i2c.readinto(result)
-            return result
+        self.startRead(register, length)
+        return self.collect()
 
     def _write_register_byte(self, register: int, value: int) -> None:
         """Low level register writing over I2C, writes one 8-bit value"""